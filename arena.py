@@ -0,0 +1,280 @@
+"""
+Headless bot-vs-bot tournaments.
+
+Plays a round robin between strategy configurations in a pool of worker processes, swapping
+colours every game, and writes the results (win/draw/loss counts per pairing, Elo estimates,
+average time per move, nodes per second, deepest search and peak memory) to a JSON file. Example:
+
+    python arena.py connect4 alphabeta:depth=5 mcts:time=0.5 mcts-solver:depth=20,time=0.5 --games 10
+"""
+import argparse
+import json
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import combinations
+
+from main import update_players
+from games.tictactoe import TicTacToe
+from games.connect4 import ConnectFour
+from games.connect4_bitboard import BitboardConnectFour
+from games.boop import Boop
+from games.boop_bitboard import BitboardBoop
+from games.easy_boop import EasyBoop
+from strategies.minimax import MinimaxPlayer
+from strategies.alphabeta import AlphaBetaPlayer
+from strategies.mcts import MCTSPlayer
+from strategies.mcts_solver import MCTSSolverPlayer
+from strategies.mcts_array import ArrayMCTSPlayer
+from strategies.mcts_dag import DAGMCTSPlayer
+from vector_env import check_vector_env
+
+GAMES = {
+    'tictactoe': TicTacToe,
+    'connect4': ConnectFour,
+    'connect4-bitboard': BitboardConnectFour,
+    'easyboop': EasyBoop,
+    'boop': Boop,
+    'boop-bitboard': BitboardBoop,
+}
+
+
+def parse_bool(value):
+    if value.lower() in ('1', 'true', 'yes', 'on'):
+        return True
+    if value.lower() in ('0', 'false', 'no', 'off'):
+        return False
+    raise ValueError(f"Invalid boolean: {value}")
+
+
+# For each strategy, its class and the spec parameters it accepts as (constructor argument, type)
+STRATEGIES = {
+    'minimax': (MinimaxPlayer, {'depth': ('depth_limit', int), 'time': ('time_limit', float)}),
+    'alphabeta': (AlphaBetaPlayer, {'depth': ('depth_limit', int), 'time': ('time_limit', float),
+                                    'tt': ('tt_size', int), 'ordering': ('move_ordering', parse_bool)}),
+    'mcts': (MCTSPlayer, {'time': ('time_limit', float), 'workers': ('workers', int),
+                          'rave': ('rave', parse_bool), 'rave_k': ('rave_equivalence', int),
+                          'rave_c': ('rave_exploration', float), 'heavy': ('heavy_playouts', parse_bool),
+                          'batch': ('batch_playouts', int), 'nodes': ('max_nodes', int)}),
+    'mcts-solver': (MCTSSolverPlayer, {'depth': ('depth_limit', int), 'time': ('time_limit', float),
+                                       'workers': ('workers', int), 'heavy': ('heavy_playouts', parse_bool),
+                                       'nodes': ('max_nodes', int)}),
+    'mcts-array': (ArrayMCTSPlayer, {'time': ('time_limit', float), 'nodes': ('max_nodes', int),
+                                     'solver': ('solver', parse_bool)}),
+    'mcts-dag': (DAGMCTSPlayer, {'time': ('time_limit', float)}),
+}
+
+
+def parse_player_spec(spec, game_name=None):
+    """
+    Parses a spec like 'alphabeta:depth=5,time=1' into the strategy name and the keyword
+    arguments of its constructor. With a game_name (a key of GAMES), also checks that the
+    options can be used in that game, so that a tournament doesn't fail on the first move.
+
+    Raises:
+        ValueError: If the strategy or one of its parameters is unknown, or if batch playouts
+            are asked for without NumPy or in a game without a vector environment.
+    """
+    name, _, params = spec.partition(':')
+    if name not in STRATEGIES:
+        raise ValueError(f"Unknown strategy '{name}'. Available: {', '.join(STRATEGIES)}")
+
+    _, accepted = STRATEGIES[name]
+    kwargs = {}
+    for param in filter(None, params.split(',')):
+        key, _, value = param.partition('=')
+        if key not in accepted:
+            raise ValueError(f"Unknown parameter '{key}' for {name}. Available: {', '.join(accepted)}")
+        argument, convert = accepted[key]
+        kwargs[argument] = convert(value)
+
+    if game_name is not None and kwargs.get('batch_playouts'):
+        try:
+            check_vector_env(GAMES[game_name]().game_name())
+        except (ImportError, ValueError) as e:
+            raise ValueError(f"Can't use batch playouts in '{spec}': {e}") from None
+    return name, kwargs
+
+
+def create_player(spec, player_number):
+    name, kwargs = parse_player_spec(spec)
+    player_class, _ = STRATEGIES[name]
+    return player_class(player=player_number, **kwargs)
+
+
+def play_match(game_name, specs, seed, max_moves):
+    """
+    Plays one game between two player specs, specs[0] moving first. Returns the winner
+    (1, 2 or None for a draw) and, for each player, the number of moves, the time spent,
+    the nodes (or simulations) searched, the deepest search and the peak memory.
+    """
+    random.seed(seed)
+    game = GAMES[game_name]()
+    players = [create_player(spec, number) for number, spec in enumerate(specs, start=1)]
+    stats = [{'moves': 0, 'time': 0.0, 'nodes': 0, 'max_depth': 0, 'max_tree_size': 0, 'peak_memory_kb': 0}
+             for _ in players]
+
+    n_moves = 0
+    while not game.is_game_over() and n_moves < max_moves:
+        turn = game.get_current_player()
+        start_time = time.time()
+        move, n = players[turn - 1].choose_move(game)
+        duration = time.time() - start_time
+
+        player_stats = stats[turn - 1]
+        search_stats = players[turn - 1].search_stats
+        player_stats['moves'] += 1
+        player_stats['time'] += duration
+        player_stats['nodes'] += search_stats.nodes if search_stats is not None else n
+        if search_stats is not None:
+            player_stats['max_depth'] = max(player_stats['max_depth'], search_stats.max_depth or 0)
+            player_stats['max_tree_size'] = max(player_stats['max_tree_size'], search_stats.tree_size or 0)
+            player_stats['peak_memory_kb'] = max(player_stats['peak_memory_kb'], search_stats.peak_memory_kb or 0)
+
+        game.make_move(move)
+        update_players(players, move)
+        n_moves += 1
+
+    for player in players:
+        if hasattr(player, 'close'):
+            player.close()
+
+    return game.get_winner(), stats
+
+
+def estimate_elo(labels, results, iterations=2000):
+    """
+    Fits Elo ratings to the game results by repeatedly moving every rating towards the one
+    that makes its expected score match its actual score. Ratings are centred on 1500.
+
+    Parameters:
+        labels (list): The player labels.
+        results (dict): (label_a, label_b) -> [wins of a, draws, losses of a].
+    """
+    ratings = {label: 0.0 for label in labels}
+    for _ in range(iterations):
+        for label in labels:
+            expected = actual = games = 0
+            for (first, second), (wins, draws, losses) in results.items():
+                if label not in (first, second):
+                    continue
+                opponent = second if label == first else first
+                n_games = wins + draws + losses
+                points = wins + 0.5 * draws if label == first else losses + 0.5 * draws
+                expected += n_games / (1 + 10 ** ((ratings[opponent] - ratings[label]) / 400))
+                actual += points
+                games += n_games
+            if games:
+                ratings[label] += 32 * (actual - expected) / games
+
+    mean = sum(ratings.values()) / len(ratings)
+    return {label: round(rating - mean + 1500, 1) for label, rating in ratings.items()}
+
+
+def run_tournament(game_name, specs, games_per_pairing=10, workers=None, max_moves=500, seed=None):
+    """Plays the round robin and returns the results as a JSON-serializable dict."""
+    for spec in specs:
+        parse_player_spec(spec, game_name)
+
+    # The same spec can appear twice, so players are identified by label
+    labels = [spec if specs.count(spec) == 1 else f'{spec}#{i}' for i, spec in enumerate(specs)]
+    rng = random.Random(seed)
+
+    tasks = []
+    for first, second in combinations(range(len(specs)), 2):
+        for game_index in range(games_per_pairing):
+            # Colours swap every game
+            order = (first, second) if game_index % 2 == 0 else (second, first)
+            tasks.append((order, rng.getrandbits(64)))
+
+    results = {(labels[a], labels[b]): [0, 0, 0] for a, b in combinations(range(len(specs)), 2)}
+    totals = {label: {'moves': 0, 'time': 0.0, 'nodes': 0, 'max_depth': 0, 'max_tree_size': 0, 'peak_memory_kb': 0}
+              for label in labels}
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [(order, executor.submit(play_match, game_name, [specs[i] for i in order], task_seed, max_moves))
+                   for order, task_seed in tasks]
+
+        for order, future in futures:
+            winner, stats = future.result()
+            for index, player_stats in zip(order, stats):
+                total = totals[labels[index]]
+                for key in ('moves', 'time', 'nodes'):
+                    total[key] += player_stats[key]
+                for key in ('max_depth', 'max_tree_size', 'peak_memory_kb'):
+                    total[key] = max(total[key], player_stats[key])
+
+            pairing = tuple(sorted(order))
+            counts = results[(labels[pairing[0]], labels[pairing[1]])]
+            if winner is None:
+                counts[1] += 1
+            elif order[winner - 1] == pairing[0]:
+                counts[0] += 1
+            else:
+                counts[2] += 1
+
+    elo = estimate_elo(labels, results)
+    players = []
+    for label in labels:
+        total = totals[label]
+        wins = draws = losses = 0
+        for (first, second), (w, d, lo) in results.items():
+            if label == first:
+                wins, draws, losses = wins + w, draws + d, losses + lo
+            elif label == second:
+                wins, draws, losses = wins + lo, draws + d, losses + w
+        players.append({
+            'player': label,
+            'elo': elo[label],
+            'wins': wins,
+            'draws': draws,
+            'losses': losses,
+            'moves': total['moves'],
+            'avg_time_per_move': total['time'] / total['moves'] if total['moves'] else 0.0,
+            'nodes_per_second': total['nodes'] / total['time'] if total['time'] else 0.0,
+            'max_depth': total['max_depth'],
+            'max_tree_size': total['max_tree_size'],
+            'peak_memory_kb': total['peak_memory_kb'],
+        })
+
+    return {
+        'game': game_name,
+        'games_per_pairing': games_per_pairing,
+        'players': players,
+        'pairings': [{'players': [first, second], 'wins': w, 'draws': d, 'losses': lo}
+                     for (first, second), (w, d, lo) in results.items()],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Play a round robin between bot configurations.")
+    parser.add_argument('game', choices=sorted(GAMES))
+    parser.add_argument('players', nargs='+',
+                        help="Player specs, e.g. 'alphabeta:depth=5' or 'mcts:time=0.5'. "
+                             f"Strategies: {', '.join(STRATEGIES)}")
+    parser.add_argument('--games', type=int, default=10, help="Games per pairing (colours swap every game)")
+    parser.add_argument('--workers', type=int, default=None, help="Worker processes (default: one per core)")
+    parser.add_argument('--max-moves', type=int, default=500, help="Moves after which a game is a draw")
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--output', default='arena_results.json')
+    args = parser.parse_args()
+
+    if len(args.players) < 2:
+        parser.error("At least two players are needed")
+
+    try:
+        results = run_tournament(args.game, args.players, args.games, args.workers, args.max_moves, args.seed)
+    except ValueError as e:
+        parser.error(str(e))
+
+    with open(args.output, 'w') as output:
+        json.dump(results, output, indent=2)
+
+    for player in sorted(results['players'], key=lambda p: -p['elo']):
+        print(f"{player['player']}: Elo {player['elo']}, W/D/L {player['wins']}/{player['draws']}/{player['losses']}, "
+              f"{player['avg_time_per_move']:.4f} s/move, {player['nodes_per_second']:.0f} nodes/s")
+    print(f'Results written to {args.output}')
+
+
+if __name__ == "__main__":
+    main()
@@ -2,8 +2,16 @@ from abc import ABC, abstractmethod
 
 
 class BotPlayer(ABC):
+    # SearchStats of the last choose_move call, None before the first one
+    search_stats = None
+
     @abstractmethod
-    def choose_move(self, game):
+    def choose_move(self, game, stop=None):
+        """
+        Returns the chosen move and the number of nodes (or simulations) searched. stop is an
+        optional StopToken: once it is stopped or its deadline passes, the search returns the
+        best move it has found so far.
+        """
         pass
 
     @abstractmethod
@@ -6,6 +6,13 @@ class Game(ABC):
     def make_move(self, move):
         pass
 
+    def make_move_unchecked(self, move):
+        """
+        Makes a move known to come from get_available_moves, skipping validation. Meant for
+        searches; games whose validation is expensive override it, the rest just validate.
+        """
+        return self.make_move(move)
+
     @abstractmethod
     def undo_move(self):
         pass
@@ -38,6 +45,73 @@ class Game(ABC):
     def get_winner(self):
         pass
 
+    @abstractmethod
+    def get_hash(self):
+        pass
+
+    def get_canonical_hash(self):
+        """
+        Returns the hash of the canonical copy of the position among its rotations and
+        reflections, and the transform that maps the position onto it, so that symmetric
+        positions share one key. This default has no symmetries: the position's own hash and
+        transform 0, the identity.
+        """
+        return self.get_hash(), 0
+
+    def transform_move(self, move, transform):
+        """Maps a move of the position to the same move in the copy given by transform."""
+        return move
+
+    def untransform_move(self, move, transform):
+        """Maps a move of the copy given by transform back to the position, undoing transform_move."""
+        return move
+
+    @abstractmethod
+    def all_moves(self):
+        """Every move that can be played in the game, indexed by its move id."""
+        pass
+
+    @abstractmethod
+    def encode_move(self, move):
+        """
+        Returns the dense integer id of a move, its index in all_moves().
+
+        Raises:
+            ValueError: If the move doesn't exist in the game.
+        """
+        pass
+
+    def decode_move(self, move_id):
+        return self.all_moves()[move_id]
+
+    def get_available_move_ids(self):
+        return [self.encode_move(move) for move in self.get_available_moves()]
+
+    def get_winning_moves(self, player):
+        """
+        Returns the moves that would win the game right away for player. This default tries
+        every move, so it only answers for the player to move; games override it with faster
+        checks that also work for the other player.
+        """
+        if self.is_game_over() or self.get_current_player() != player:
+            return []
+
+        winning_moves = []
+        for move in self.get_available_moves():
+            self.make_move_unchecked(move)
+            if self.get_winner() == player:
+                winning_moves.append(move)
+            self.undo_move()
+        return winning_moves
+
+    def get_blocking_moves(self, player):
+        """
+        Returns the moves of the player to move that take one of the immediate wins of player
+        (usually the opponent) away by playing on the same square.
+        """
+        threats = self.get_winning_moves(player)
+        return [move for move in self.get_available_moves() if move in threats] if threats else []
+
     @abstractmethod
     def game_name(self):
         pass
@@ -1,7 +1,24 @@
-import copy
-
 from game import Game
-from games.games_utils import adjust_start_position, create_action_dict, is_bigger_piece
+from games.games_utils import (SYMMETRY_INVERSES, canonical_hash, create_action_dict, is_bigger_piece, line_windows,
+                               square_symmetries)
+from games.zobrist import zobrist_table
+
+# Zobrist keys for every (square, letter) pair, square = row * 6 + col, for the number of big
+# cats owned by each player and for whose turn it is and what it is for (placing or changing).
+SQUARE_KEYS = zobrist_table('boop', 36, 4)
+LETTER_INDEX = {'a': 0, 'A': 1, 'b': 2, 'B': 3}
+BIG_COUNT_KEYS = zobrist_table('boop-big-count', 2, 9)
+TURN_KEYS = zobrist_table('boop-turn', 2, 2)
+
+# The squares every square goes to under the 8 rotations and reflections of the board.
+SYMMETRIES = square_symmetries(6)
+
+# Every line of three squares on the board, and for every square (row * 6 + col) the lines that go
+# through it, as (index in LINE_WINDOWS, other position, other position) tuples.
+LINE_WINDOWS = line_windows()
+WINDOWS_THROUGH_SQUARE = tuple([(index, *[position for position in window if position != divmod(square, 6)])
+                                for index, window in enumerate(LINE_WINDOWS) if divmod(square, 6) in window]
+                               for square in range(36))
 
 
 class Boop(Game):
@@ -12,6 +29,11 @@ class Boop(Game):
     MOVE_B = "Move Big"
     CHANGE = "Change"
 
+    # Entry types of the undo log kept for every move.
+    SQUARE_CHANGED = 0
+    PIECE_REMOVED = 1
+    PIECE_ADDED = 2
+
     LETTER_DICT = {'a': (1, 'small'),
                    'A': (1, 'big'),
                    'b': (2, 'small'),
@@ -39,13 +61,18 @@ class Boop(Game):
         self.board = [[' ' for _ in range(6)] for _ in range(6)]
         self.current_player = 1
         self.winner = None
-        self.previous_state = None
         self.player_pieces = {
             1: {'small': 8, 'big': 0, 'played_small': [], 'played_big': []},
             2: {'small': 8, 'big': 0, 'played_small': [], 'played_big': []}
         }
         self.next_states = [create_action_dict(1, Boop.PLACE_CAT, [])]
         self.track_previous_state = True
+        self.undo_stack = []
+        self.move_log = None
+        # Bit mask (bit row * 6 + col) of the squares to look at for lines of each player's cats,
+        # indexed by player - 1 (see check_lines)
+        self.unchecked_squares = [0, 0]
+        self.hash = TURN_KEYS[0][0] ^ BIG_COUNT_KEYS[0][0] ^ BIG_COUNT_KEYS[1][0]
 
     def game_name(self):
         """
@@ -65,6 +92,53 @@ class Boop(Game):
         """
         return self.winner
 
+    def get_hash(self):
+        """
+        Get the Zobrist key of the current position, maintained incrementally by make_move.
+        """
+        return self.hash
+
+    def get_canonical_hash(self):
+        """
+        Get the smallest Zobrist key among the 8 rotations and reflections of the position, and
+        the index of the transform that gives it (see square_symmetries).
+        """
+        pieces = [(row * 6 + col, LETTER_INDEX[letter])
+                  for row in range(6) for col, letter in enumerate(self.board[row]) if letter != ' ']
+        return canonical_hash(self.hash, pieces, SQUARE_KEYS, SYMMETRIES)
+
+    def transform_move(self, move, transform):
+        """
+        Maps a move to the copy of the position given by transform (see transform_boop_move).
+        """
+        return transform_boop_move(move, transform)
+
+    def untransform_move(self, move, transform):
+        return transform_boop_move(move, SYMMETRY_INVERSES[transform])
+
+    def all_moves(self):
+        """
+        Get every possible move, indexed by move id: placing a small cat on each square (ids 0-35),
+        placing a big cat (36-71), upgrading a single cat (72-107) and upgrading the three cats
+        of each line (108-187).
+        """
+        return ALL_MOVES
+
+    def encode_move(self, move):
+        """
+        Get the move id of a move.
+
+        Raises:
+            ValueError: If the move doesn't exist in the game.
+        """
+        return encode_boop_move(move)
+
+    def turn_key(self):
+        """
+        Get the Zobrist key of the pending action (player and type) at the head of next_states.
+        """
+        return action_key(self.next_states[0])
+
     def process_user_input(self, user_input):
         """
         Process user input and return the corresponding move.
@@ -78,41 +152,26 @@ class Boop(Game):
         Raises:
             ValueError: If the input format is incorrect or coordinates are not numbers.
         """
-        parts = user_input.split()
-
-        if len(parts) < 2:
-            raise ValueError("Invalid format. Include an action and a coordinate\n" + Boop.HOW_TO_USE)
-
-        action, coordinates = parts[0], parts[1]
-
-        if not coordinates.isdigit():
-            raise ValueError("Coordinates should be numbers")
-
-        if action == "ms" and len(coordinates) == 2:
-            return Boop.MOVE_S, [(int(coordinates[0]), int(coordinates[1]))]
-        elif action == "mb" and len(coordinates) == 2:
-            return Boop.MOVE_B, [(int(coordinates[0]), int(coordinates[1]))]
-        elif action == "c1" and len(coordinates) == 2:
-            return Boop.CHANGE, [(int(coordinates[0]), int(coordinates[1]))]
-        elif action == "c3" and len(coordinates) == 6:
-            pos_list = [(int(coordinates[i]), int(coordinates[i + 1])) for i in range(0, len(coordinates), 2)]
-            return Boop.CHANGE, pos_list
-        else:
-            raise ValueError(f"Invalid format. {Boop.HOW_TO_USE}")
+        return parse_boop_input(user_input)
 
     def copy(self, track_previous_state=True):
         new_game = Boop()
         new_game.board = [row[:] for row in self.board]
         new_game.current_player = self.current_player
         new_game.winner = self.winner
-        new_game.player_pieces = copy.deepcopy(self.player_pieces)  # Deep copy
-        new_game.next_states = copy.deepcopy(self.next_states)  # Deep copy
+        new_game.player_pieces = {
+            player: {'small': pieces['small'], 'big': pieces['big'],
+                     'played_small': pieces['played_small'][:], 'played_big': pieces['played_big'][:]}
+            for player, pieces in self.player_pieces.items()
+        }
+        # The action dicts are never modified once created, so they can be shared
+        new_game.next_states = self.next_states[:]
 
+        # Logged moves are never modified either, so sharing the stack entries is enough
         new_game.track_previous_state = track_previous_state
-        if track_previous_state and self.previous_state:
-            new_game.previous_state = self.previous_state.copy()
-        else:
-            new_game.previous_state = None
+        new_game.undo_stack = self.undo_stack[:] if track_previous_state else []
+        new_game.unchecked_squares = self.unchecked_squares[:]
+        new_game.hash = self.hash
 
         return new_game
 
@@ -155,6 +214,20 @@ class Boop(Game):
 
         return combined_positions
 
+    def pieces_in_hand(self, index):
+        """
+        Retrieves the number of cats of one kind that are not on the board, like BitboardBoop.
+
+        Parameters:
+            index (int): (player - 1) * 2 for small cats, plus 1 for big cats.
+
+        Returns:
+            int: The number of cats in hand.
+        """
+        size = 'big' if index % 2 else 'small'
+        player_data = self.player_pieces[index // 2 + 1]
+        return player_data[size] - len(player_data[f'played_{size}'])
+
     def make_move(self, move):
         """
         Executes a given move in the game. This can be either placing a cat on the board or changing cats.
@@ -172,9 +245,29 @@ class Boop(Game):
             print(f'Move: {move} not in available moves: {available_moves}')
             return False
 
-        # Save the current state for potential undo functionality
+        return self.make_move_unchecked(move)
+
+    def make_move_unchecked(self, move):
+        """
+        Executes a move that is known to be in get_available_moves, without checking it.
+
+        Parameters:
+            move (tuple): Contains the type of move and the positions associated with the move.
+
+        Returns:
+            bool: Always True.
+        """
+        # Record what this move changes for potential undo functionality
         if self.track_previous_state:
-            self.previous_state = self.copy()
+            self.move_log = []
+            counts = (self.player_pieces[1]['small'], self.player_pieces[1]['big'],
+                      self.player_pieces[2]['small'], self.player_pieces[2]['big'])
+            self.undo_stack.append((self.move_log, counts, tuple(self.unchecked_squares), self.current_player,
+                                    self.winner, len(self.next_states), self.next_states[0], self.hash))
+        else:
+            self.move_log = None
+
+        self.hash ^= self.turn_key()
 
         # Extract move type and positions
         mov_type, positions = move
@@ -190,6 +283,9 @@ class Boop(Game):
             # Execute a change cats move
             self.make_change_cats_move(positions)
 
+        if self.next_states:
+            self.hash ^= self.turn_key()
+
         # Update the current player if the game is not over
         if not self.is_game_over():
             self.current_player = self.next_states[0]["player"]
@@ -222,16 +318,18 @@ class Boop(Game):
 
         # Determine the player number and size based on the letter
         player, size = Boop.LETTER_DICT[letter]
-        self.player_pieces[player][f'played_{size}'].remove((row, col))
+        self.remove_played_piece(player, size, (row, col))
 
         # Remove the small cat from the board
-        self.board[row][col] = ' '
+        self.set_square(row, col, ' ')
 
         # Update the counts of small and big pieces for the respective player
         # Only if the piece is a small piece (lowercase letter)
         if letter.islower():
+            big = self.player_pieces[player]['big']
             self.player_pieces[player]['small'] -= 1
-            self.player_pieces[player]['big'] += 1
+            self.player_pieces[player]['big'] = big + 1
+            self.hash ^= BIG_COUNT_KEYS[player - 1][big] ^ BIG_COUNT_KEYS[player - 1][big + 1]
 
     def make_normal_move(self, row, col, size):
         """
@@ -245,8 +343,8 @@ class Boop(Game):
         """
         # Determine the letter for the current player's piece
         letter = Boop.PLAYER_DICT[(self.current_player, size)]
-        self.board[row][col] = letter
-        self.player_pieces[self.current_player][f'played_{size}'].append((row, col))
+        self.set_square(row, col, letter)
+        self.add_played_piece(self.current_player, size, (row, col))
 
         # Shift adjacent pieces and check for wins or changes
         self.shift_adjacent_pieces(row, col)
@@ -276,14 +374,7 @@ class Boop(Game):
 
             three_changes = []
             if not winner:
-                for pos in positions:
-                    three_result = self.check_three(pos, played_pieces_count)
-                    if three_result[0] == 'WIN':
-                        winner = True
-                    elif three_result[0] == 'CHANGE_3':
-                        for change_vec in three_result[1]:
-                            if change_vec not in three_changes:
-                                three_changes.append(change_vec)
+                winner, three_changes = self.check_lines(positions)
 
             if three_changes:
                 possible_changes.append(('CHANGE_3', three_changes))
@@ -414,111 +505,126 @@ class Boop(Game):
         if not (0 <= target_row < 6 and 0 <= target_col < 6):
             fallen_piece = self.board[row][col]
             player, size = Boop.LETTER_DICT[fallen_piece]
-            self.board[row][col] = ' '
-            self.player_pieces[player][f'played_{size}'].remove((row, col))
+            self.set_square(row, col, ' ')
+            self.remove_played_piece(player, size, (row, col))
             return None
 
         # Case when the target position is empty on the board
         elif self.board[target_row][target_col] == ' ':
             shifted_piece = self.board[row][col]
             player, size = Boop.LETTER_DICT[shifted_piece]
-            self.board[target_row][target_col] = self.board[row][col]
-            self.player_pieces[player][f'played_{size}'].remove((row, col))
-            self.player_pieces[player][f'played_{size}'].append((target_row, target_col))
-            self.board[row][col] = ' '
+            self.set_square(target_row, target_col, shifted_piece)
+            self.remove_played_piece(player, size, (row, col))
+            self.add_played_piece(player, size, (target_row, target_col))
+            self.set_square(row, col, ' ')
             return [target_row, target_col]
 
         # No movement is made
         return None
 
-    def undo_move(self):
-        """Reverts a move on the board."""
-        previous_state = self.previous_state.copy()
-        if previous_state:
-            self.board = previous_state.board
-            self.current_player = previous_state.current_player
-            self.winner = previous_state.winner
-            self.previous_state = previous_state.previous_state
-            self.player_pieces = previous_state.player_pieces
-            self.next_states = previous_state.next_states
+    def set_square(self, row, col, letter):
+        """
+        Writes a letter on the board, logging the previous content if the move is being tracked.
+        """
+        previous_letter = self.board[row][col]
+        if self.move_log is not None:
+            self.move_log.append((Boop.SQUARE_CHANGED, row, col, previous_letter))
+        if previous_letter != ' ':
+            self.hash ^= SQUARE_KEYS[row * 6 + col][LETTER_INDEX[previous_letter]]
+        if letter != ' ':
+            index = LETTER_INDEX[letter]
+            self.hash ^= SQUARE_KEYS[row * 6 + col][index]
+            self.unchecked_squares[index // 2] |= 1 << (row * 6 + col)
+        self.board[row][col] = letter
 
-    def check_three(self, position, n_pieces):
+    def remove_played_piece(self, player, size, position):
+        """
+        Removes a position from the played pieces of a player, logging where it was in the list.
         """
-        Checks if the last move leads to a win, a change, or neither.
-        Evaluates lines (rows, columns, diagonals) from the last move for three consecutive cats.
+        played = self.player_pieces[player][f'played_{size}']
+        index = played.index(position)
+        del played[index]
+        if self.move_log is not None:
+            self.move_log.append((Boop.PIECE_REMOVED, player, size, index, position))
 
-        Returns:
-            A tuple indicating either a win, a change of three small cats to big cats, or none.
-            For wins and changes, it also returns the positions of the cats involved.
+    def add_played_piece(self, player, size, position):
         """
-        row, col = position
-        max_count = 3
-        possible_changes = []
+        Appends a position to the played pieces of a player, logging the addition.
+        """
+        self.player_pieces[player][f'played_{size}'].append(position)
+        if self.move_log is not None:
+            self.move_log.append((Boop.PIECE_ADDED, player, size))
 
-        # Optimization:
-        if n_pieces > 4 and not (row in [1, 4] or col in [1, 4]):
-            return 'NOTHING'
+    def undo_move(self):
+        """
+        Reverts the last move by replaying its undo log backwards. Only the squares and piece
+        lists touched by the move are restored, so the cost doesn't depend on the game length.
+        """
+        if not self.undo_stack:
+            return
 
-        # Check all directions from the last move: rows, columns, diagonals
-        directions = [
-            (0, 1),  # Row
-            (1, 0),  # Column
-            (1, 1),  # Diagonal down-right
-            (1, -1)  # Diagonal down-left
-        ]
-
-        for dr, dc in directions:
-            start_row, start_col = adjust_start_position(row, col, dr, dc, max_count)
-            result = self.has_three_in_line(start_row, start_col, dr, dc, max_count)
-
-            if result[0] == 'WIN':
-                return result
-            elif result[0] == 'CHANGE_3':
-                if result[1] not in possible_changes:
-                    possible_changes.extend(result[1])
-
-        if possible_changes:
-            return 'CHANGE_3', possible_changes
-        return 'NOTHING'
-
-    def has_three_in_line(self, start_row, start_col, delta_row, delta_col, max_count):
-        """Checks a line for a three-in-line condition. Evaluates both small and big cats.
-        If three big cats are in line, it's a win. If three cats in line but not all are big,
-        it marks a possible change from small to big cats."""
-        count = 0
-        big_count = 0
-        three_pos = []
-        possible_changes = []
-        letter = Boop.PLAYER_DICT[(self.current_player, 'small')]
-
-        row, col = start_row, start_col
-        for _ in range(max_count + 2):
-            if 0 <= row < 6 and 0 <= col < 6:
-                this_letter = self.board[row][col]
-                if this_letter.lower() == letter.lower():
-                    three_pos.append((row, col))
-                    count += 1
-                    if this_letter.isupper():
-                        big_count += 1
-
-                    if count == max_count:
-                        if big_count == max_count:
-                            return 'WIN', three_pos  # Win condition with all big cats
-                        possible_changes.append(three_pos.copy())  # Potential change with small cats
-                        r, c = three_pos.pop(0)
-                        if self.board[r][c] == letter.upper():
-                            big_count -= 1
-                        count -= 1
-                else:
-                    three_pos = []  # Reset if sequence is broken
-                    count = big_count = 0
-
-            row += delta_row
-            col += delta_col
-
-        if possible_changes:
-            return 'CHANGE_3', possible_changes
-        return 'NONE', []  # No three-in-line found
+        (move_log, counts, unchecked, self.current_player, self.winner,
+         n_next_states, current_state, self.hash) = self.undo_stack.pop()
+
+        for entry in reversed(move_log):
+            if entry[0] == Boop.SQUARE_CHANGED:
+                _, row, col, letter = entry
+                self.board[row][col] = letter
+            elif entry[0] == Boop.PIECE_REMOVED:
+                _, player, size, index, position = entry
+                self.player_pieces[player][f'played_{size}'].insert(index, position)
+            else:
+                _, player, size = entry
+                self.player_pieces[player][f'played_{size}'].pop()
+
+        (self.player_pieces[1]['small'], self.player_pieces[1]['big'],
+         self.player_pieces[2]['small'], self.player_pieces[2]['big']) = counts
+        self.unchecked_squares = list(unchecked)
+
+        # The move popped the first state and appended the following ones
+        del self.next_states[n_next_states - 1:]
+        self.next_states.insert(0, current_state)
+
+    def check_lines(self, positions):
+        """
+        Finds the lines of three cats of the current player. Only the lines through its unchecked
+        squares are looked at: the squares its cats reached since its last check, whoever moved
+        them there, and the squares of the lines it didn't change then. Any other line was
+        already on the board, unchanged, at that check, so lines that the opponent's boops made
+        on the previous turn are found too.
+
+        Parameters:
+            positions (list of tuples): The positions of the current player's cats.
+
+        Returns:
+            tuple: Whether three big cats are in line, and the lines of three cats that can be
+            changed if they aren't, in board order.
+        """
+        own = set(positions)
+        unchecked = self.unchecked_squares[self.current_player - 1]
+        self.unchecked_squares[self.current_player - 1] = 0
+        line_indices = set()
+        while unchecked:
+            low_bit = unchecked & -unchecked
+            unchecked ^= low_bit
+            square = low_bit.bit_length() - 1
+            if divmod(square, 6) in own:
+                for index, first, second in WINDOWS_THROUGH_SQUARE[square]:
+                    if first in own and second in own:
+                        line_indices.add(index)
+        if not line_indices:
+            return False, []
+
+        big = set(self.player_pieces[self.current_player]['played_big'])
+        lines = [LINE_WINDOWS[index] for index in sorted(line_indices)]
+        if any(window[0] in big and window[1] in big and window[2] in big for window in lines):
+            return True, []
+
+        # Lines that are not changed now must be found again at the next check
+        for window in lines:
+            for row, col in window:
+                self.unchecked_squares[self.current_player - 1] |= 1 << (row * 6 + col)
+        return False, lines
 
     def get_available_moves(self):
         """
@@ -555,6 +661,63 @@ class Boop(Game):
 
         return available_moves
 
+    def get_winning_moves(self, player):
+        """
+        Returns the moves that would win the game right away for player: its winning placements
+        when it is about to place a cat, and none while a choice of cats to change is pending.
+        """
+        if placing_player(self.next_states) != player:
+            return []
+        return self.winning_placements(player)
+
+    def winning_placements(self, player):
+        """
+        Returns the placements that would win the game right away for player, as if it were
+        placing a cat now, whatever the pending decision is. A small cat can't move big cats, so
+        only big cat placements can make a new line of three big cats or put the eighth big cat
+        on the board. Small placements only win when the opponent already pushed three big cats
+        of player in line. The candidates are played and undone.
+        """
+        if self.winner is not None:
+            return []
+
+        pieces = self.player_pieces[player]
+        played_big = set(pieces['played_big'])
+        big_in_hand = pieces['big'] > len(played_big)
+        line_on_board = len(played_big) >= 3 and any(all(position in played_big for position in window)
+                                                     for window in LINE_WINDOWS)
+        if not line_on_board and (not big_in_hand or (len(played_big) < 2 and pieces['big'] < 8)):
+            return []
+
+        # Pretend player is about to place a cat, tracking the moves to undo them
+        current_player = self.current_player
+        track_previous_state = self.track_previous_state
+        self.next_states.insert(0, create_action_dict(player, Boop.PLACE_CAT, []))
+        self.current_player = player
+        self.track_previous_state = True
+
+        winning_moves = []
+        for move in self.get_available_moves():
+            if move[0] == Boop.MOVE_B or line_on_board:
+                self.make_move_unchecked(move)
+                if self.winner == player:
+                    winning_moves.append(move)
+                self.undo_move()
+
+        self.next_states.pop(0)
+        self.current_player = current_player
+        self.track_previous_state = track_previous_state
+        return winning_moves
+
+    def get_blocking_moves(self, player):
+        """
+        Returns the placements of the player to move on the squares where player could win
+        right away.
+        """
+        if placing_player(self.next_states) is None:
+            return []
+        return blocking_placements(self.get_available_moves(), self.winning_placements(player))
+
     def get_available_spaces(self):
         """
         Retrieves a list of available spaces on the board.
@@ -572,7 +735,7 @@ class Boop(Game):
         if self.winner:
             return 1 if self.winner == player else -1
         else:
-            opponent = 1 if player == 2 else 1
+            opponent = 1 if player == 2 else 2
             player_pieces = self.player_pieces[player]
             opponent_pieces = self.player_pieces[opponent]
 
@@ -583,3 +746,92 @@ class Boop(Game):
 
     def next_player(self):
         self.current_player = 2 if self.current_player == 1 else 1
+
+
+# Every possible move, indexed by move id (see Boop.all_moves), and the id of each move with its
+# positions as a tuple. Lines of three are listed in the order in which Boop finds them.
+ALL_MOVES = ([(Boop.MOVE_S, [(row, col)]) for row in range(6) for col in range(6)] +
+             [(Boop.MOVE_B, [(row, col)]) for row in range(6) for col in range(6)] +
+             [(Boop.CHANGE, [(row, col)]) for row in range(6) for col in range(6)] +
+             [(Boop.CHANGE, window) for window in LINE_WINDOWS])
+MOVE_IDS = {(move_type, tuple(positions)): move_id for move_id, (move_type, positions) in enumerate(ALL_MOVES)}
+
+
+def transform_boop_move(move, transform):
+    """
+    Maps a Boop move to the copy of the position given by transform. The positions of a line are
+    kept in board order, like in every line of the game.
+    """
+    mov_type, positions = move
+    squares = SYMMETRIES[transform]
+    return mov_type, sorted(divmod(squares[row * 6 + col], 6) for row, col in positions)
+
+
+def encode_boop_move(move):
+    """
+    Get the move id of a Boop move (see Boop.all_moves).
+
+    Raises:
+        ValueError: If the move doesn't exist in the game.
+    """
+    try:
+        return MOVE_IDS[(move[0], tuple(move[1]))]
+    except (KeyError, IndexError, TypeError):
+        raise ValueError(f"Unknown move: {move}") from None
+
+
+def action_key(state):
+    """
+    Get the Zobrist key of a pending action of next_states, from its player and type.
+    """
+    return TURN_KEYS[state["player"] - 1][state["type"] != Boop.PLACE_CAT]
+
+
+def placing_player(next_states):
+    """
+    Get the player who is about to place a cat, or None when cats must be changed first or the
+    game is over.
+    """
+    if next_states and next_states[0]["type"] == Boop.PLACE_CAT:
+        return next_states[0]["player"]
+    return None
+
+
+def blocking_placements(available_moves, threats):
+    """
+    Get the placements of available_moves on the squares of the winning placements threats.
+    """
+    threat_squares = [positions[0] for _, positions in threats]
+    if not threat_squares:
+        return []
+    return [move for move in available_moves if move[1][0] in threat_squares]
+
+
+def parse_boop_input(user_input):
+    """
+    Process a user's command for Boop and return the corresponding move (see Boop.HOW_TO_USE).
+
+    Raises:
+        ValueError: If the input format is incorrect or coordinates are not numbers.
+    """
+    parts = user_input.split()
+
+    if len(parts) < 2:
+        raise ValueError("Invalid format. Include an action and a coordinate\n" + Boop.HOW_TO_USE)
+
+    action, coordinates = parts[0], parts[1]
+
+    if not coordinates.isdigit():
+        raise ValueError("Coordinates should be numbers")
+
+    if action == "ms" and len(coordinates) == 2:
+        return Boop.MOVE_S, [(int(coordinates[0]), int(coordinates[1]))]
+    elif action == "mb" and len(coordinates) == 2:
+        return Boop.MOVE_B, [(int(coordinates[0]), int(coordinates[1]))]
+    elif action == "c1" and len(coordinates) == 2:
+        return Boop.CHANGE, [(int(coordinates[0]), int(coordinates[1]))]
+    elif action == "c3" and len(coordinates) == 6:
+        pos_list = [(int(coordinates[i]), int(coordinates[i + 1])) for i in range(0, len(coordinates), 2)]
+        return Boop.CHANGE, pos_list
+    else:
+        raise ValueError(f"Invalid format. {Boop.HOW_TO_USE}")
@@ -0,0 +1,384 @@
+from game import Game
+from games.boop import (Boop, ALL_MOVES, BIG_COUNT_KEYS, SQUARE_KEYS, SYMMETRIES, TURN_KEYS, action_key,
+                        blocking_placements, encode_boop_move, parse_boop_input, placing_player, transform_boop_move)
+from games.games_utils import SYMMETRY_INVERSES, canonical_hash, create_action_dict
+
+BOARD_SIZE = 6
+
+# Index of every piece mask in BitboardBoop.pieces: (player - 1) * 2 + size.
+SMALL = 0
+BIG = 1
+LETTERS = ['a', 'A', 'b', 'B']
+
+# Same direction order as Boop.shift_adjacent_pieces.
+DIRECTIONS = [(-1, 0), (1, 0), (0, -1), (0, 1), (-1, -1), (-1, 1), (1, -1), (1, 1)]
+
+
+def _on_board(row, col):
+    return 0 <= row < BOARD_SIZE and 0 <= col < BOARD_SIZE
+
+
+def _build_push_table():
+    """
+    For every square, the (neighbor bit, target bit, neighbor square, target square) entries of
+    the pieces that a cat placed there would boop. The target bit is 0 (and the target square
+    None) when the neighbor would fall off the board.
+    """
+    table = []
+    for row in range(BOARD_SIZE):
+        for col in range(BOARD_SIZE):
+            pushes = []
+            for dr, dc in DIRECTIONS:
+                adj_row, adj_col = row + dr, col + dc
+                if not _on_board(adj_row, adj_col):
+                    continue
+                adj_square = adj_row * BOARD_SIZE + adj_col
+                target_row, target_col = adj_row + dr, adj_col + dc
+                if _on_board(target_row, target_col):
+                    target_square = target_row * BOARD_SIZE + target_col
+                    pushes.append((1 << adj_square, 1 << target_square, adj_square, target_square))
+                else:
+                    pushes.append((1 << adj_square, 0, adj_square, None))
+            table.append(tuple(pushes))
+    return tuple(table)
+
+
+def _build_line_windows():
+    """
+    For every square, the 3-in-a-row windows that start on it, as (mask, positions) pairs.
+    Each window on the board appears exactly once, with its positions in line order.
+    """
+    table = [[] for _ in range(BOARD_SIZE * BOARD_SIZE)]
+    for row in range(BOARD_SIZE):
+        for col in range(BOARD_SIZE):
+            for dr, dc in [(0, 1), (1, 0), (1, 1), (1, -1)]:
+                positions = [(row + i * dr, col + i * dc) for i in range(3)]
+                if all(_on_board(r, c) for r, c in positions):
+                    mask = 0
+                    for r, c in positions:
+                        mask |= 1 << (r * BOARD_SIZE + c)
+                    table[row * BOARD_SIZE + col].append((mask, positions))
+    return tuple(tuple(windows) for windows in table)
+
+
+PUSH_TABLE = _build_push_table()
+WINDOWS_FROM_SQUARE = _build_line_windows()
+SQUARE_POSITIONS = tuple((sq // BOARD_SIZE, sq % BOARD_SIZE) for sq in range(BOARD_SIZE * BOARD_SIZE))
+PLACE_MOVES = (
+    tuple((Boop.MOVE_S, [position]) for position in SQUARE_POSITIONS),
+    tuple((Boop.MOVE_B, [position]) for position in SQUARE_POSITIONS),
+)
+
+
+def piece_index(pieces, bit):
+    """Returns the index of the piece mask that holds bit."""
+    if pieces[0] & bit:
+        return 0
+    if pieces[1] & bit:
+        return 1
+    if pieces[2] & bit:
+        return 2
+    return 3
+
+
+def iter_squares(mask):
+    """Yields the square index of every bit set in mask, lowest first."""
+    while mask:
+        low_bit = mask & -mask
+        yield low_bit.bit_length() - 1
+        mask ^= low_bit
+
+
+class BitboardBoop(Game):
+    """
+    Boop with one 36-bit mask per (player, size) instead of nested lists. It follows the
+    rules of Boop move by move; the only difference is that options are listed in
+    board order instead of the order in which the pieces were played.
+    """
+
+    def __init__(self):
+        self.pieces = [0, 0, 0, 0]
+        # Pieces owned by each (player, size), on the board or in hand.
+        self.owned = [8, 0, 8, 0]
+        self.current_player = 1
+        self.winner = None
+        self.next_states = [create_action_dict(1, Boop.PLACE_CAT, [])]
+        self.undo_stack = []
+        self.hash = TURN_KEYS[0][0] ^ BIG_COUNT_KEYS[0][0] ^ BIG_COUNT_KEYS[1][0]
+
+    def game_name(self):
+        return "Boop"
+
+    def get_current_player(self):
+        return self.current_player
+
+    def get_winner(self):
+        return self.winner
+
+    def get_hash(self):
+        """Zobrist key of the position, equal to the key Boop computes for the same position."""
+        return self.hash
+
+    def get_canonical_hash(self):
+        pieces = [(square, index) for index in range(4) for square in iter_squares(self.pieces[index])]
+        return canonical_hash(self.hash, pieces, SQUARE_KEYS, SYMMETRIES)
+
+    def transform_move(self, move, transform):
+        return transform_boop_move(move, transform)
+
+    def untransform_move(self, move, transform):
+        return transform_boop_move(move, SYMMETRY_INVERSES[transform])
+
+    def all_moves(self):
+        return ALL_MOVES
+
+    def encode_move(self, move):
+        return encode_boop_move(move)
+
+    def turn_key(self):
+        return action_key(self.next_states[0])
+
+    def process_user_input(self, user_input):
+        return parse_boop_input(user_input)
+
+    def copy(self, track_previous_state=True):
+        new_game = BitboardBoop()
+        new_game.pieces = self.pieces[:]
+        new_game.owned = self.owned[:]
+        new_game.current_player = self.current_player
+        new_game.winner = self.winner
+        new_game.next_states = self.next_states[:]
+        new_game.undo_stack = self.undo_stack[:] if track_previous_state else []
+        new_game.hash = self.hash
+        return new_game
+
+    @property
+    def board(self):
+        """The board as a 6x6 grid of letters, like Boop.board."""
+        board = [[' ' for _ in range(BOARD_SIZE)] for _ in range(BOARD_SIZE)]
+        for index, mask in enumerate(self.pieces):
+            for sq in iter_squares(mask):
+                row, col = SQUARE_POSITIONS[sq]
+                board[row][col] = LETTERS[index]
+        return board
+
+    def print_board(self):
+        print('    0   1   2   3   4   5')
+        for i, row in enumerate(self.board):
+            print(f"{i} | " + ' | '.join(row) + ' |')
+        print()
+
+        n_a, n_A, n_b, n_B = (self.pieces_in_hand(index) for index in range(4))
+        print(f'Rest of pieces-> a: {n_a}, A: {n_A}, b: {n_b}, B: {n_B}')
+        print(f'Current winner: {self.winner}')
+
+    def pieces_in_hand(self, index):
+        return self.owned[index] - self.pieces[index].bit_count()
+
+    def make_move(self, move):
+        if not self.is_valid_move(move):
+            print(f'Move: {move} not in available moves: {self.get_available_moves()}')
+            return False
+
+        return self.make_move_unchecked(move)
+
+    def make_move_unchecked(self, move):
+        """Executes a move that is known to be in get_available_moves, without checking it."""
+        self.undo_stack.append((tuple(self.pieces), tuple(self.owned), self.current_player,
+                                self.winner, self.next_states[:], self.hash))
+
+        mov_type, positions = move
+        self.hash ^= self.turn_key()
+        current_state = self.next_states.pop(0)
+
+        if current_state["type"] == Boop.PLACE_CAT:
+            row, col = positions[0]
+            self.make_normal_move(row * BOARD_SIZE + col, SMALL if mov_type == Boop.MOVE_S else BIG)
+        else:
+            self.make_change_cats_move(positions)
+
+        if self.next_states:
+            self.hash ^= self.turn_key()
+
+        if not self.is_game_over():
+            self.current_player = self.next_states[0]["player"]
+
+        return True
+
+    def is_valid_move(self, move):
+        """Checks a move against the current state without generating every available move."""
+        if not self.next_states:
+            return False
+
+        state = self.next_states[0]
+        mov_type, positions = move
+        if state["type"] == Boop.PLACE_CAT:
+            if mov_type not in (Boop.MOVE_S, Boop.MOVE_B) or len(positions) != 1:
+                return False
+            row, col = positions[0]
+            if not _on_board(row, col):
+                return False
+            index = (state["player"] - 1) * 2 + (SMALL if mov_type == Boop.MOVE_S else BIG)
+            occupied = self.pieces[0] | self.pieces[1] | self.pieces[2] | self.pieces[3]
+            return self.pieces_in_hand(index) > 0 and not occupied & (1 << (row * BOARD_SIZE + col))
+
+        return mov_type == Boop.CHANGE and positions in state["options"]
+
+    def make_normal_move(self, square, size):
+        """Places a piece, boops its neighbors, resolves lines and queues the next turn."""
+        pieces = self.pieces
+        index = (self.current_player - 1) * 2 + size
+        pieces[index] |= 1 << square
+        self.hash ^= SQUARE_KEYS[square][index]
+
+        occupied = pieces[0] | pieces[1] | pieces[2] | pieces[3]
+        for neighbor_bit, target_bit, neighbor_square, target_square in PUSH_TABLE[square]:
+            if not occupied & neighbor_bit:
+                continue
+            neighbor = piece_index(pieces, neighbor_bit)
+            # A small cat can't boop a big one
+            if size == SMALL and neighbor % 2 == BIG:
+                continue
+            if not target_bit:
+                pieces[neighbor] ^= neighbor_bit
+                self.hash ^= SQUARE_KEYS[neighbor_square][neighbor]
+            elif not occupied & target_bit:
+                pieces[neighbor] ^= neighbor_bit | target_bit
+                self.hash ^= SQUARE_KEYS[neighbor_square][neighbor] ^ SQUARE_KEYS[target_square][neighbor]
+
+        self.process_results()
+        self.next_states.append(create_action_dict(3 - self.current_player, Boop.PLACE_CAT, []))
+
+    def process_results(self):
+        """Checks the current player's pieces for a win or for cats that must be upgraded."""
+        base = (self.current_player - 1) * 2
+        small_mask, big_mask = self.pieces[base + SMALL], self.pieces[base + BIG]
+        player_mask = small_mask | big_mask
+        played_pieces_count = player_mask.bit_count()
+
+        if played_pieces_count < 3:
+            return
+
+        if big_mask.bit_count() == 8:
+            self.winner = self.current_player
+            return
+
+        change_options = []
+        if played_pieces_count == 8:
+            change_options.extend([[SQUARE_POSITIONS[sq]] for sq in iter_squares(small_mask)])
+            change_options.extend([[SQUARE_POSITIONS[sq]] for sq in iter_squares(big_mask)])
+
+        for sq in iter_squares(player_mask):
+            for mask, positions in WINDOWS_FROM_SQUARE[sq]:
+                if player_mask & mask == mask:
+                    if big_mask & mask == mask:
+                        self.winner = self.current_player
+                        return
+                    change_options.append(positions)
+
+        if len(change_options) == 1:
+            self.make_change_cats_move(change_options[0])
+        elif len(change_options) > 1:
+            self.next_states.append(create_action_dict(self.current_player, Boop.CHANGE_CATS, change_options))
+
+    def make_change_cats_move(self, positions):
+        """Removes the chosen cats from the board, upgrading the small ones to big cats."""
+        for row, col in positions:
+            square = row * BOARD_SIZE + col
+            bit = 1 << square
+            index = piece_index(self.pieces, bit)
+            self.pieces[index] ^= bit
+            self.hash ^= SQUARE_KEYS[square][index]
+            if index % 2 == SMALL:
+                big = self.owned[index + 1]
+                self.owned[index] -= 1
+                self.owned[index + 1] = big + 1
+                self.hash ^= BIG_COUNT_KEYS[index // 2][big] ^ BIG_COUNT_KEYS[index // 2][big + 1]
+
+    def undo_move(self):
+        """Reverts the last move on the board."""
+        if not self.undo_stack:
+            return
+
+        pieces, owned, self.current_player, self.winner, self.next_states, self.hash = self.undo_stack.pop()
+        self.pieces = list(pieces)
+        self.owned = list(owned)
+
+    def get_available_moves(self):
+        if not self.next_states:
+            return []
+
+        state = self.next_states[0]
+        if state["type"] != Boop.PLACE_CAT:
+            return [(Boop.CHANGE, option) for option in state["options"]]
+
+        base = (state["player"] - 1) * 2
+        sizes = [size for size in (SMALL, BIG) if self.pieces_in_hand(base + size) > 0]
+        occupied = self.pieces[0] | self.pieces[1] | self.pieces[2] | self.pieces[3]
+        return [PLACE_MOVES[size][sq]
+                for sq in range(BOARD_SIZE * BOARD_SIZE) if not occupied & (1 << sq)
+                for size in sizes]
+
+    def get_winning_moves(self, player):
+        if placing_player(self.next_states) != player:
+            return []
+        return self.winning_placements(player)
+
+    def winning_placements(self, player):
+        """
+        Returns the placements that would win the game right away for player, as if it were
+        placing a cat now. Same candidates as Boop.winning_placements: big cat placements, and
+        small ones too when three big cats of player are already in line.
+        """
+        if self.winner is not None:
+            return []
+
+        big_index = (player - 1) * 2 + BIG
+        big_mask = self.pieces[big_index]
+        big_on_board = big_mask.bit_count()
+        line_on_board = big_on_board >= 3 and any(big_mask & mask == mask
+                                                  for sq in iter_squares(big_mask)
+                                                  for mask, _ in WINDOWS_FROM_SQUARE[sq])
+        if not line_on_board and (not self.pieces_in_hand(big_index)
+                                  or (big_on_board < 2 and self.owned[big_index] < 8)):
+            return []
+
+        # Pretend player is about to place a cat
+        current_player = self.current_player
+        self.next_states.insert(0, create_action_dict(player, Boop.PLACE_CAT, []))
+        self.current_player = player
+
+        winning_moves = []
+        for move in self.get_available_moves():
+            if move[0] == Boop.MOVE_B or line_on_board:
+                self.make_move_unchecked(move)
+                if self.winner == player:
+                    winning_moves.append(move)
+                self.undo_move()
+
+        self.next_states.pop(0)
+        self.current_player = current_player
+        return winning_moves
+
+    def get_blocking_moves(self, player):
+        if placing_player(self.next_states) is None:
+            return []
+        return blocking_placements(self.get_available_moves(), self.winning_placements(player))
+
+    def is_game_over(self):
+        return self.winner is not None
+
+    def evaluate_game_state(self, player):
+        if self.winner:
+            return 1 if self.winner == player else -1
+        else:
+            player_big = (player - 1) * 2 + BIG
+            opponent_big = (2 - player) * 2 + BIG
+
+            player_points = 0.05 * (self.pieces[player_big].bit_count() + self.owned[player_big])
+            opponent_points = 0.05 * (self.pieces[opponent_big].bit_count() + self.owned[opponent_big])
+
+            return player_points - opponent_points
+
+    def next_player(self):
+        self.current_player = 2 if self.current_player == 1 else 1
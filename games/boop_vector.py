@@ -0,0 +1,172 @@
+import numpy as np
+
+from vector_env import VectorEnv
+from games.boop import Boop, ALL_MOVES, LINE_WINDOWS
+
+SQUARES = 36
+# Board codes: 0 for empty squares, else piece index + 1, piece index being (player - 1) * 2 for
+# small cats plus 1 for big cats (a, A, b, B like Boop.LETTER_DICT).
+LETTER_CODES = {' ': 0, 'a': 1, 'A': 2, 'b': 3, 'B': 4}
+
+# Move ids of ALL_MOVES: small placements, big placements, then the change options (single cats
+# and lines of three).
+BIG_PLACEMENTS = 36
+CHANGES = 72
+N_MOVES = len(ALL_MOVES)
+
+# Same direction order as Boop.shift_adjacent_pieces.
+DIRECTIONS = [(-1, 0), (1, 0), (0, -1), (0, 1), (-1, -1), (-1, 1), (1, -1), (1, 1)]
+
+
+def _build_push_table():
+    """
+    For every square and direction, the neighbor square and the square it gets booped to. The
+    neighbor is -1 off the board, and the target is -1 when the neighbor would fall off.
+    """
+    neighbors = np.full((SQUARES, 8), -1, dtype=np.int64)
+    targets = np.full((SQUARES, 8), -1, dtype=np.int64)
+    for square in range(SQUARES):
+        row, col = divmod(square, 6)
+        for direction, (dr, dc) in enumerate(DIRECTIONS):
+            if 0 <= row + dr < 6 and 0 <= col + dc < 6:
+                neighbors[square, direction] = (row + dr) * 6 + col + dc
+                if 0 <= row + 2 * dr < 6 and 0 <= col + 2 * dc < 6:
+                    targets[square, direction] = (row + 2 * dr) * 6 + col + 2 * dc
+    return neighbors, targets
+
+
+def _build_option_squares():
+    """The squares of every change option, by move id - CHANGES."""
+    squares = np.zeros((N_MOVES - CHANGES, SQUARES), dtype=bool)
+    for option, (_, positions) in enumerate(ALL_MOVES[CHANGES:]):
+        squares[option, [row * 6 + col for row, col in positions]] = True
+    return squares
+
+
+NEIGHBORS, TARGETS = _build_push_table()
+WINDOWS = np.array([[row * 6 + col for row, col in window] for window in LINE_WINDOWS])
+OPTION_SQUARES = _build_option_squares()
+
+
+class BoopVectorEnv(VectorEnv):
+    """
+    Boop boards as an (n, 36) int8 array of board codes, with the cats owned by every piece
+    index, the player to move and whether it has to choose cats to change. Placements, boops,
+    cats falling off, lines of three and wins follow Boop. Move ids are those of Boop, so a
+    pending change is a choice among the legal change ids, like any other move.
+    """
+
+    def __init__(self):
+        self.reset(0)
+
+    def reset(self, n, game=None):
+        board = np.zeros(SQUARES, dtype=np.int8)
+        owned = np.array([8, 0, 8, 0], dtype=np.int8)
+        player, winner = 1, 0
+        options = np.zeros(N_MOVES - CHANGES, dtype=bool)
+        if game is not None:
+            board[:] = [LETTER_CODES[letter] for row in game.board for letter in row]
+            owned[:] = [(board == index + 1).sum() + game.pieces_in_hand(index) for index in range(4)]
+            player, winner = game.get_current_player(), game.get_winner() or 0
+            if game.next_states and game.next_states[0]["type"] == Boop.CHANGE_CATS:
+                options[[move_id - CHANGES for move_id in game.get_available_move_ids()]] = True
+
+        self.boards = np.tile(board, (n, 1))
+        self.owned = np.tile(owned, (n, 1))
+        self.current_player = np.full(n, player, dtype=np.int8)
+        self.winner = np.full(n, winner, dtype=np.int8)
+        # Change options of the environments where the player to move has to choose cats to change
+        self.options = np.tile(options, (n, 1))
+        self.changing = self.options.any(axis=1)
+
+    def legal_mask(self):
+        n = len(self.boards)
+        mask = np.zeros((n, N_MOVES), dtype=bool)
+        placing = ~self.changing & ~self.terminal()
+        empty = self.boards == 0
+        small_index = (self.current_player.astype(np.int64) - 1) * 2
+        rows = np.arange(n)
+        small_in_hand = self.owned[rows, small_index] > (self.boards == small_index[:, None] + 1).sum(axis=1)
+        big_in_hand = self.owned[rows, small_index + 1] > (self.boards == small_index[:, None] + 2).sum(axis=1)
+        mask[:, :BIG_PLACEMENTS] = empty & (placing & small_in_hand)[:, None]
+        mask[:, BIG_PLACEMENTS:CHANGES] = empty & (placing & big_in_hand)[:, None]
+        mask[:, CHANGES:] = self.options & ~self.terminal()[:, None]
+        return mask
+
+    def step(self, actions):
+        active = ~self.terminal()
+        changing = np.flatnonzero(active & self.changing)
+        placing = np.flatnonzero(active & ~self.changing)
+        if len(changing):
+            self.change_cats(changing, actions[changing] - CHANGES)
+            self.options[changing] = False
+            self.changing[changing] = False
+            self.current_player[changing] = 3 - self.current_player[changing]
+        if len(placing):
+            self.place_cats(placing, actions[placing])
+
+    def place_cats(self, envs, actions):
+        """Places the cats, boops their neighbors and resolves the lines of the player who moved."""
+        boards = self.boards
+        squares = actions % BIG_PLACEMENTS
+        big = actions >= BIG_PLACEMENTS
+        players = self.current_player[envs].astype(np.int64)
+        boards[envs, squares] = (players - 1) * 2 + big + 1
+
+        # Boops. Neighbors and targets of different directions never overlap, so every push
+        # can be decided on the board after the placement.
+        rows = np.repeat(envs, 8)
+        neighbors = NEIGHBORS[squares].ravel()
+        targets = TARGETS[squares].ravel()
+        neighbor_codes = np.where(neighbors >= 0, boards[rows, neighbors], 0)
+        # A small cat can't boop a big one (even codes are big cats)
+        pushed = (neighbor_codes != 0) & (np.repeat(big, 8) | (neighbor_codes % 2 == 1))
+        falls = pushed & (targets < 0)
+        moves = pushed & (targets >= 0)
+        moves[moves] = boards[rows[moves], targets[moves]] == 0
+        boards[rows[moves], targets[moves]] = neighbor_codes[moves]
+        boards[rows[falls | moves], neighbors[falls | moves]] = 0
+
+        # Lines and piece counts of the player who moved
+        player_boards = boards[envs]
+        small_code = (players - 1) * 2 + 1
+        own = (player_boards == small_code[:, None]) | (player_boards == small_code[:, None] + 1)
+        own_big = player_boards == small_code[:, None] + 1
+        n_own = own.sum(axis=1)
+        lines = own[:, WINDOWS].all(axis=2)
+        won = (n_own >= 3) & ((own_big.sum(axis=1) == 8) | own_big[:, WINDOWS].all(axis=2).any(axis=1))
+        self.winner[envs[won]] = players[won]
+
+        # Change options: every cat when all eight are on the board, and every line of three
+        options = np.zeros((len(envs), N_MOVES - CHANGES), dtype=bool)
+        options[:, :SQUARES] = own & (n_own == 8)[:, None]
+        options[:, SQUARES:] = lines
+        options[won | (n_own < 3)] = False
+        n_options = options.sum(axis=1)
+
+        single = np.flatnonzero(n_options == 1)
+        if len(single):
+            self.change_cats(envs[single], options[single].argmax(axis=1))
+
+        choice = n_options > 1
+        self.options[envs[choice]] = options[choice]
+        self.changing[envs[choice]] = True
+        passing = envs[~choice & ~won]
+        self.current_player[passing] = 3 - self.current_player[passing]
+
+    def change_cats(self, envs, options):
+        """Takes the cats of the change options off the board, upgrading small cats to big ones."""
+        squares = OPTION_SQUARES[options]
+        small_index = (self.current_player[envs].astype(np.int64) - 1) * 2
+        upgraded = (squares & (self.boards[envs] == small_index[:, None] + 1)).sum(axis=1)
+        self.owned[envs, small_index] -= upgraded
+        self.owned[envs, small_index + 1] += upgraded
+        boards = self.boards[envs]
+        boards[squares] = 0
+        self.boards[envs] = boards
+
+    def terminal(self):
+        return self.winner != 0
+
+    def reward(self, player):
+        return np.where(self.winner == player, 1, np.where(self.winner == 0, 0, -1))
@@ -1,4 +1,48 @@
 from game import Game
+from games.games_utils import canonical_hash, line_score_table, lines_by_cell, mirror_symmetries
+from games.zobrist import zobrist_keys, zobrist_table
+
+# Zobrist keys for every (cell, player) pair, cell = row * 7 + column, and for the second player to move.
+CELL_KEYS = zobrist_table('connect4', 42, 2)
+SIDE_KEY = zobrist_keys('connect4-side', 1)[0]
+
+# Moves are column indices, so every move is its own id.
+ALL_MOVES = list(range(7))
+
+# The cells every cell goes to as is and mirrored left to right, the only symmetry of the board.
+SYMMETRIES = mirror_symmetries(6, 7)
+
+
+def _build_lines():
+    """The (row, col) cells of every line of four: rows, columns and both diagonals."""
+    lines = []
+    for row in range(6):
+        for col in range(7):
+            for dr, dc in [(0, 1), (1, 0), (1, 1), (1, -1)]:
+                cells = [(row + i * dr, col + i * dc) for i in range(4)]
+                if all(0 <= r < 6 and 0 <= c < 7 for r, c in cells):
+                    lines.append(cells)
+    return lines
+
+
+def _build_windows_by_cell():
+    """For every cell (row, col), the other three cells of each line of four that contains it."""
+    windows = {(row, col): [] for row in range(6) for col in range(7)}
+    for cells in LINES:
+        for cell in cells:
+            windows[cell].append([other for other in cells if other != cell])
+    return windows
+
+
+LINES = _build_lines()
+WINDOWS_BY_CELL = _build_windows_by_cell()
+# Lines through every cell, cell = row * 7 + column.
+LINES_BY_CELL = lines_by_cell([[row * 7 + col for row, col in cells] for cells in LINES], 42)
+
+# Threat counting: value of a line by the pieces of the first and second player in it. The sum
+# over every line is scaled below 1, so it never outweighs a finished game.
+LINE_SCORES = line_score_table([0, 1, 4, 16, 64])
+EVAL_SCALE = 1 / (len(LINES) * 16 + 1)
 
 
 class ConnectFour(Game):
@@ -6,7 +50,11 @@ class ConnectFour(Game):
         self.board = [[' ' for _ in range(7)] for _ in range(6)]
         self.current_player = 1
         self.winner = None
-        self.previous_state = None
+        self.undo_stack = []
+        self.hash = 0
+        # Pieces of each player in every line and the threat score for the first player
+        self.line_counts = ([0] * len(LINES), [0] * len(LINES))
+        self.threat_score = 0
 
     def game_name(self):
         return "Connect4"
@@ -17,6 +65,31 @@ class ConnectFour(Game):
     def get_winner(self):
         return self.winner
 
+    def get_hash(self):
+        return self.hash
+
+    def get_canonical_hash(self):
+        pieces = [(row * 7 + col, 0 if letter == 'X' else 1)
+                  for row in range(6) for col, letter in enumerate(self.board[row]) if letter != ' ']
+        return canonical_hash(self.hash, pieces, CELL_KEYS, SYMMETRIES)
+
+    def transform_move(self, move, transform):
+        return 6 - move if transform else move
+
+    def untransform_move(self, move, transform):
+        return self.transform_move(move, transform)
+
+    def all_moves(self):
+        return ALL_MOVES
+
+    def encode_move(self, move):
+        if move not in range(7):
+            raise ValueError(f"Unknown move: {move}")
+        return move
+
+    def get_available_move_ids(self):
+        return self.get_available_moves()
+
     def process_user_input(self, user_input):
 
         if not user_input.isdigit() and len(user_input) != 1:
@@ -29,7 +102,10 @@ class ConnectFour(Game):
         new_game.board = [row[:] for row in self.board]
         new_game.current_player = self.current_player
         new_game.winner = self.winner
-        new_game.previous_state = self.previous_state
+        new_game.undo_stack = self.undo_stack[:] if track_previous_state else []
+        new_game.hash = self.hash
+        new_game.line_counts = (self.line_counts[0][:], self.line_counts[1][:])
+        new_game.threat_score = self.threat_score
         return new_game
 
     def print_board(self):
@@ -46,11 +122,13 @@ class ConnectFour(Game):
         if self.board[0][column] != ' ':
             return False
 
-        self.previous_state = self.copy()
-        row = next(row for row in reversed(self.board) if row[column] == ' ')
-        row[column] = 'X' if player == 1 else 'O'
+        row_index = next(r for r in range(5, -1, -1) if self.board[r][column] == ' ')
+        self.undo_stack.append((row_index, column, self.winner))
+        self.board[row_index][column] = 'X' if player == 1 else 'O'
+        self.hash ^= CELL_KEYS[row_index * 7 + column][player - 1] ^ SIDE_KEY
+        self.update_threats(row_index * 7 + column, player, 1)
 
-        if self.check_winner(column, row, player):
+        if self.check_winner(column, row_index, player):
             self.winner = player
 
         self.current_player = self.next_player()
@@ -58,17 +136,27 @@ class ConnectFour(Game):
 
     def undo_move(self):
         """Reverts a move on the board."""
-        previous_state = self.previous_state.copy()
-        if self.previous_state:
-            self.board = previous_state.board
-            self.current_player = previous_state.current_player
-            self.winner = previous_state.winner
-            self.previous_state = previous_state.previous_state
-
-    def check_winner(self, column, row, player):
+        if self.undo_stack:
+            row_index, column, self.winner = self.undo_stack.pop()
+            self.board[row_index][column] = ' '
+            self.current_player = self.next_player()
+            self.hash ^= CELL_KEYS[row_index * 7 + column][self.current_player - 1] ^ SIDE_KEY
+            self.update_threats(row_index * 7 + column, self.current_player, -1)
+
+    def update_threats(self, cell, player, step):
+        """Adds (step 1) or removes (step -1) a piece of player in the line counts and the threat score."""
+        counts_1, counts_2 = self.line_counts
+        counts = self.line_counts[player - 1]
+        score = self.threat_score
+        for line in LINES_BY_CELL[cell]:
+            score -= LINE_SCORES[counts_1[line]][counts_2[line]]
+            counts[line] += step
+            score += LINE_SCORES[counts_1[line]][counts_2[line]]
+        self.threat_score = score
+
+    def check_winner(self, column, row_index, player):
         letter = 'X' if player == 1 else 'O'
         # Check horizontal, vertical, and both diagonals
-        row_index = self.board.index(row)
         directions = [(0, 1), (1, 0), (1, 1), (1, -1)]
         for dr, dc in directions:
             count = 0
@@ -85,14 +173,36 @@ class ConnectFour(Game):
     def get_available_moves(self):
         return [i for i in [3, 2, 4, 1, 5, 0, 6] if self.board[0][i] == ' ']
 
+    def get_winning_moves(self, player):
+        """Columns whose next free cell completes a line of four of player."""
+        if self.winner is not None:
+            return []
+
+        letter = 'X' if player == 1 else 'O'
+        winning_moves = []
+        for column in self.get_available_moves():
+            row_index = next(r for r in range(5, -1, -1) if self.board[r][column] == ' ')
+            for window in WINDOWS_BY_CELL[(row_index, column)]:
+                if all(self.board[r][c] == letter for r, c in window):
+                    winning_moves.append(column)
+                    break
+        return winning_moves
+
     def is_game_over(self):
         return self.winner is not None or all(self.board[0][i] != ' ' for i in range(7))
 
     def evaluate_game_state(self, player):
+        """
+        1 or -1 for a finished game, 0 for a draw, else the threat score: lines of four that only
+        hold pieces of one player, weighted by how many they hold.
+        """
         if self.winner:
             return 1 if self.winner == player else -1
-        else:
+        elif self.is_game_over():
             return 0
+        else:
+            score = self.threat_score * EVAL_SCALE
+            return score if player == 1 else -score
 
     def next_player(self):
         if self.current_player == 1:
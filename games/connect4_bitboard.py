@@ -0,0 +1,210 @@
+from game import Game
+from games.connect4 import ALL_MOVES, CELL_KEYS, EVAL_SCALE, LINE_SCORES, LINES, SIDE_KEY, SYMMETRIES
+from games.games_utils import canonical_hash
+
+# Each column uses 7 bits: 6 playable rows plus one sentinel bit on top, so shifted
+# lines never wrap from one column into the next. Bit index = column * 7 + row,
+# with row 0 being the bottom of the board.
+ROWS = 6
+COLUMNS = 7
+COLUMN_HEIGHT = ROWS + 1
+BOTTOM_BITS = [col * COLUMN_HEIGHT for col in range(COLUMNS)]
+TOP_BITS = [col * COLUMN_HEIGHT + ROWS - 1 for col in range(COLUMNS)]
+
+# ConnectFour cell (row * 7 + column, top row first) of every bit index, None for sentinel bits.
+BIT_CELLS = [(ROWS - 1 - bit % COLUMN_HEIGHT) * COLUMNS + bit // COLUMN_HEIGHT if bit % COLUMN_HEIGHT < ROWS else None
+             for bit in range(COLUMNS * COLUMN_HEIGHT)]
+
+# Zobrist keys by bit index, shared with ConnectFour so both implementations hash positions alike.
+BIT_KEYS = [CELL_KEYS[cell] if cell is not None else None for cell in BIT_CELLS]
+
+# Bit mask of every ConnectFour line, for the same threat score as ConnectFour. It is only
+# computed when a non-final position is evaluated, so make and undo stay cheap.
+LINE_MASKS = [sum(1 << (col * COLUMN_HEIGHT + ROWS - 1 - row) for row, col in cells) for cells in LINES]
+
+# Shift amounts for the four line directions: vertical, horizontal and both diagonals.
+DIRECTIONS = (1, COLUMN_HEIGHT, COLUMN_HEIGHT + 1, COLUMN_HEIGHT - 1)
+
+
+def winning_cells(bitboard):
+    """
+    Returns the mask of the cells that would complete four aligned bits of bitboard, whether
+    they are free or not. Sentinel bits can be set too, so the result must be masked.
+    """
+    # Vertical: only three below
+    cells = (bitboard << 1) & (bitboard << 2) & (bitboard << 3)
+    for shift in DIRECTIONS[1:]:
+        # Two aligned on one side and one or zero on the other, in both orientations
+        pairs = (bitboard << shift) & (bitboard << 2 * shift)
+        cells |= pairs & (bitboard << 3 * shift)
+        cells |= pairs & (bitboard >> shift)
+        pairs = (bitboard >> shift) & (bitboard >> 2 * shift)
+        cells |= pairs & (bitboard << shift)
+        cells |= pairs & (bitboard >> 3 * shift)
+    return cells
+
+
+def has_four(bitboard):
+    """Returns True if the bitboard contains four aligned bits in any direction."""
+    for shift in DIRECTIONS:
+        pairs = bitboard & (bitboard >> shift)
+        if pairs & (pairs >> (2 * shift)):
+            return True
+    return False
+
+
+class BitboardConnectFour(Game):
+    """
+    ConnectFour stored as two 49-bit integers (one per player) plus the next free bit of
+    every column. Moves, undo and win detection work on integers, without copying the board.
+    """
+
+    def __init__(self):
+        self.bitboards = [0, 0]
+        self.heights = BOTTOM_BITS[:]
+        self.current_player = 1
+        self.winner = None
+        self.moves_played = []
+        self.hash = 0
+
+    def game_name(self):
+        return "Connect4"
+
+    def get_current_player(self):
+        return self.current_player
+
+    def get_winner(self):
+        return self.winner
+
+    def get_hash(self):
+        return self.hash
+
+    def get_canonical_hash(self):
+        pieces = [(BIT_CELLS[bit], index)
+                  for index, bitboard in enumerate(self.bitboards)
+                  for bit in range(COLUMNS * COLUMN_HEIGHT) if bitboard >> bit & 1]
+        return canonical_hash(self.hash, pieces, CELL_KEYS, SYMMETRIES)
+
+    def transform_move(self, move, transform):
+        return COLUMNS - 1 - move if transform else move
+
+    def untransform_move(self, move, transform):
+        return self.transform_move(move, transform)
+
+    def all_moves(self):
+        return ALL_MOVES
+
+    def encode_move(self, move):
+        if move not in range(COLUMNS):
+            raise ValueError(f"Unknown move: {move}")
+        return move
+
+    def get_available_move_ids(self):
+        return self.get_available_moves()
+
+    def process_user_input(self, user_input):
+
+        if not user_input.isdigit() and len(user_input) != 1:
+            raise ValueError("Coordinates should be numbers")
+
+        return int(user_input)
+
+    def copy(self, track_previous_state=True):
+        new_game = BitboardConnectFour()
+        new_game.bitboards = self.bitboards[:]
+        new_game.heights = self.heights[:]
+        new_game.current_player = self.current_player
+        new_game.winner = self.winner
+        new_game.moves_played = self.moves_played[:] if track_previous_state else []
+        new_game.hash = self.hash
+        return new_game
+
+    @property
+    def board(self):
+        """The board as a 6x7 grid of letters, top row first, like ConnectFour.board."""
+        rows = []
+        for row in reversed(range(ROWS)):
+            cells = []
+            for col in range(COLUMNS):
+                bit = 1 << (col * COLUMN_HEIGHT + row)
+                if self.bitboards[0] & bit:
+                    cells.append('X')
+                elif self.bitboards[1] & bit:
+                    cells.append('O')
+                else:
+                    cells.append(' ')
+            rows.append(cells)
+        return rows
+
+    def print_board(self):
+        print(' 0 1 2 3 4 5 6')
+        for row in self.board:
+            print('|' + '|'.join(row) + '|')
+        print()
+        print(f'Current winner: {self.winner}')
+
+    def make_move(self, move):
+        column = move
+        player = self.current_player
+
+        if self.heights[column] > TOP_BITS[column]:
+            return False
+
+        self.moves_played.append((column, self.winner))
+        self.bitboards[player - 1] |= 1 << self.heights[column]
+        self.hash ^= BIT_KEYS[self.heights[column]][player - 1] ^ SIDE_KEY
+        self.heights[column] += 1
+
+        if has_four(self.bitboards[player - 1]):
+            self.winner = player
+
+        self.current_player = self.next_player()
+        return True
+
+    def undo_move(self):
+        """Reverts the last move on the board."""
+        if not self.moves_played:
+            return
+
+        column, previous_winner = self.moves_played.pop()
+        self.current_player = self.next_player()
+        self.heights[column] -= 1
+        self.bitboards[self.current_player - 1] ^= 1 << self.heights[column]
+        self.hash ^= BIT_KEYS[self.heights[column]][self.current_player - 1] ^ SIDE_KEY
+        self.winner = previous_winner
+
+    def threat_score(self):
+        """The threat score of ConnectFour for the first player, counted on the bitboards."""
+        bitboard_1, bitboard_2 = self.bitboards
+        return sum(LINE_SCORES[(bitboard_1 & mask).bit_count()][(bitboard_2 & mask).bit_count()]
+                   for mask in LINE_MASKS)
+
+    def get_available_moves(self):
+        return [i for i in [3, 2, 4, 1, 5, 0, 6] if self.heights[i] <= TOP_BITS[i]]
+
+    def get_winning_moves(self, player):
+        """Columns whose next free cell completes four for player, found with shifts of its bitboard."""
+        if self.winner is not None:
+            return []
+
+        cells = winning_cells(self.bitboards[player - 1])
+        return [column for column in self.get_available_moves() if cells >> self.heights[column] & 1]
+
+    def is_game_over(self):
+        return self.winner is not None or all(self.heights[i] > TOP_BITS[i] for i in range(COLUMNS))
+
+    def evaluate_game_state(self, player):
+        """1 or -1 for a finished game, 0 for a draw, else the threat score of ConnectFour."""
+        if self.winner:
+            return 1 if self.winner == player else -1
+        elif self.is_game_over():
+            return 0
+        else:
+            score = self.threat_score() * EVAL_SCALE
+            return score if player == 1 else -score
+
+    def next_player(self):
+        if self.current_player == 1:
+            return 2
+        else:
+            return 1
@@ -0,0 +1,61 @@
+import numpy as np
+
+from vector_env import VectorEnv
+
+ROWS = 6
+COLUMNS = 7
+PLAYER_CODES = {' ': 0, 'X': 1, 'O': 2}
+
+
+def has_four(mask):
+    """For an (n, 6, 7) boolean array, whether each board has four aligned True cells."""
+    horizontal = mask[:, :, :-3] & mask[:, :, 1:-2] & mask[:, :, 2:-1] & mask[:, :, 3:]
+    vertical = mask[:, :-3] & mask[:, 1:-2] & mask[:, 2:-1] & mask[:, 3:]
+    diagonal = mask[:, :-3, :-3] & mask[:, 1:-2, 1:-2] & mask[:, 2:-1, 2:-1] & mask[:, 3:, 3:]
+    anti_diagonal = mask[:, :-3, 3:] & mask[:, 1:-2, 2:-1] & mask[:, 2:-1, 1:-2] & mask[:, 3:, :-3]
+    return (horizontal.any(axis=(1, 2)) | vertical.any(axis=(1, 2))
+            | diagonal.any(axis=(1, 2)) | anti_diagonal.any(axis=(1, 2)))
+
+
+class ConnectFourVectorEnv(VectorEnv):
+    """
+    ConnectFour boards as an (n, 6, 7) int8 array, top row first like ConnectFour.board: 0 for
+    empty cells, else the player number. Move ids are columns, like in ConnectFour.
+    """
+
+    def __init__(self):
+        self.boards = np.zeros((0, ROWS, COLUMNS), dtype=np.int8)
+        self.heights = np.zeros((0, COLUMNS), dtype=np.int8)
+        self.current_player = np.zeros(0, dtype=np.int8)
+        self.winner = np.zeros(0, dtype=np.int8)
+
+    def reset(self, n, game=None):
+        board = np.zeros((ROWS, COLUMNS), dtype=np.int8)
+        player, winner = 1, 0
+        if game is not None:
+            board[:] = [[PLAYER_CODES[letter] for letter in row] for row in game.board]
+            player, winner = game.get_current_player(), game.get_winner() or 0
+        self.boards = np.tile(board, (n, 1, 1))
+        self.heights = np.tile((board != 0).sum(axis=0, dtype=np.int8), (n, 1))
+        self.current_player = np.full(n, player, dtype=np.int8)
+        self.winner = np.full(n, winner, dtype=np.int8)
+
+    def legal_mask(self):
+        return (self.heights < ROWS) & ~self.terminal()[:, None]
+
+    def step(self, actions):
+        active = np.flatnonzero(~self.terminal())
+        players = self.current_player[active]
+        columns = actions[active]
+        self.boards[active, ROWS - 1 - self.heights[active, columns], columns] = players
+        self.heights[active, columns] += 1
+
+        won = has_four(self.boards[active] == players[:, None, None])
+        self.winner[active[won]] = players[won]
+        self.current_player[active] = 3 - players
+
+    def terminal(self):
+        return (self.winner != 0) | (self.heights == ROWS).all(axis=1)
+
+    def reward(self, player):
+        return np.where(self.winner == player, 1, np.where(self.winner == 0, 0, -1))
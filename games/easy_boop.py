@@ -1,4 +1,22 @@
 from game import Game
+from games.games_utils import SYMMETRY_INVERSES, canonical_hash, square_symmetries
+from games.zobrist import zobrist_keys, zobrist_table
+
+# Zobrist keys for every (square, letter) pair, square = row * 6 + col, and for the second player to move.
+SQUARE_KEYS = zobrist_table('easy_boop', 36, 2)
+LETTER_INDEX = {'a': 0, 'b': 1}
+SIDE_KEY = zobrist_keys('easy_boop-side', 1)[0]
+
+# Every (row, col) move, its id being row * 6 + col.
+ALL_MOVES = [(row, col) for row in range(6) for col in range(6)]
+
+# The squares every square goes to under the 8 rotations and reflections of the board.
+SYMMETRIES = square_symmetries(6)
+
+# For every square, the squares at most two rows and two columns away from it.
+NEAR_SQUARES = {(row, col): [(r, c) for r in range(max(row - 2, 0), min(row + 3, 6))
+                             for c in range(max(col - 2, 0), min(col + 3, 6))]
+                for row in range(6) for col in range(6)}
 
 
 class EasyBoop(Game):
@@ -6,8 +24,10 @@ class EasyBoop(Game):
         self.board = [[' ' for _ in range(6)] for _ in range(6)]
         self.current_player = 1
         self.winner = None
-        self.previous_state = None
         self.pieces_count = {'a': 0, 'b': 0}
+        self.undo_stack = []
+        self.changed_squares = []
+        self.hash = 0
 
     def game_name(self):
         return "EasyBoop"
@@ -18,13 +38,36 @@ class EasyBoop(Game):
     def get_winner(self):
         return self.winner
 
+    def get_hash(self):
+        return self.hash
+
+    def get_canonical_hash(self):
+        pieces = [(row * 6 + col, LETTER_INDEX[letter])
+                  for row in range(6) for col, letter in enumerate(self.board[row]) if letter != ' ']
+        return canonical_hash(self.hash, pieces, SQUARE_KEYS, SYMMETRIES)
+
+    def transform_move(self, move, transform):
+        return divmod(SYMMETRIES[transform][move[0] * 6 + move[1]], 6)
+
+    def untransform_move(self, move, transform):
+        return self.transform_move(move, SYMMETRY_INVERSES[transform])
+
+    def all_moves(self):
+        return ALL_MOVES
+
+    def encode_move(self, move):
+        if not (isinstance(move, tuple) and len(move) == 2 and move[0] in range(6) and move[1] in range(6)):
+            raise ValueError(f"Unknown move: {move}")
+        return move[0] * 6 + move[1]
+
     def copy(self, track_previous_state=True):
         new_game = EasyBoop()
         new_game.board = [row[:] for row in self.board]
         new_game.current_player = self.current_player
         new_game.winner = self.winner
-        new_game.previous_state = self.previous_state
         new_game.pieces_count = self.pieces_count.copy()
+        new_game.undo_stack = self.undo_stack[:] if track_previous_state else []
+        new_game.hash = self.hash
         return new_game
 
     def print_board(self):
@@ -48,11 +91,14 @@ class EasyBoop(Game):
         if self.board[row][col] != ' ':
             return False
 
-        self.previous_state = self.copy()
+        # Only the squares touched by this move are recorded for undo_move
+        self.changed_squares = []
+        self.undo_stack.append((self.changed_squares, self.pieces_count['a'], self.pieces_count['b'],
+                                self.winner, self.current_player, self.hash))
 
         shifted_pieces = self.shift_adjacent_pieces(row, col)
 
-        self.board[row][col] = current_player_letter
+        self.set_square(row, col, current_player_letter)
         self.pieces_count[current_player_letter] += 1
 
         shifted_pieces.append([row, col])
@@ -62,6 +108,7 @@ class EasyBoop(Game):
                 self.winner = 1 if winner == 'a' else 2
 
         self.current_player = 2 if self.current_player == 1 else 1
+        self.hash ^= SIDE_KEY
 
         return True
 
@@ -80,25 +127,34 @@ class EasyBoop(Game):
         target_row, target_col = row + dr, col + dc
         if not (0 <= target_row < 6 and 0 <= target_col < 6):
             fallen_piece = self.board[row][col]
-            self.board[row][col] = ' '
+            self.set_square(row, col, ' ')
             if fallen_piece in self.pieces_count:
                 self.pieces_count[fallen_piece] -= 1
         elif self.board[target_row][target_col] == ' ':
-            self.board[target_row][target_col] = self.board[row][col]
-            self.board[row][col] = ' '
+            self.set_square(target_row, target_col, self.board[row][col])
+            self.set_square(row, col, ' ')
             return [target_row, target_col]
 
         return None
 
+    def set_square(self, row, col, letter):
+        """Writes a square, remembering its previous content for undo_move."""
+        previous_letter = self.board[row][col]
+        self.changed_squares.append((row, col, previous_letter))
+        if previous_letter != ' ':
+            self.hash ^= SQUARE_KEYS[row * 6 + col][LETTER_INDEX[previous_letter]]
+        if letter != ' ':
+            self.hash ^= SQUARE_KEYS[row * 6 + col][LETTER_INDEX[letter]]
+        self.board[row][col] = letter
+
     def undo_move(self):
         """Reverts a move on the board."""
-        previous_state = self.previous_state.copy()
-        if self.previous_state:
-            self.board = previous_state.board
-            self.current_player = previous_state.current_player
-            self.winner = previous_state.winner
-            self.previous_state = previous_state.previous_state
-            self.pieces_count = previous_state.pieces_count
+        if self.undo_stack:
+            changed_squares, count_a, count_b, self.winner, self.current_player, self.hash = self.undo_stack.pop()
+            for row, col, letter in reversed(changed_squares):
+                self.board[row][col] = letter
+            self.pieces_count['a'] = count_a
+            self.pieces_count['b'] = count_b
 
     def check_winner(self, last_move):
         """Checks if the last move leads to a win."""
@@ -167,6 +223,41 @@ class EasyBoop(Game):
 
         return moves_classified['central'] + moves_classified['intermediate'] + moves_classified['outer']
 
+    def get_winning_moves(self, player):
+        """
+        Returns the squares where a piece of player would win, for either player. Pushes make a
+        table lookup inexact, so candidate squares are played and undone. A new line of three
+        always has a piece that was placed or pushed, so only squares with a piece of player at
+        most two squares away can complete one; the eight pieces win is checked on every square.
+        """
+        if self.winner is not None:
+            return []
+
+        letter = 'a' if player == 1 else 'b'
+        if self.pieces_count[letter] == 7:
+            candidates = self.get_available_moves()
+        elif self.pieces_count[letter] >= 2:
+            near = set()
+            for row in range(6):
+                for col in range(6):
+                    if self.board[row][col] == letter:
+                        near.update(NEAR_SQUARES[(row, col)])
+            candidates = [move for move in self.get_available_moves() if move in near]
+        else:
+            return []
+
+        # Play the candidates as player, whoever is to move
+        current_player = self.current_player
+        self.current_player = player
+        winning_moves = []
+        for move in candidates:
+            self.make_move(move)
+            if self.winner == player:
+                winning_moves.append(move)
+            self.undo_move()
+        self.current_player = current_player
+        return winning_moves
+
     def is_game_over(self):
         return self.winner is not None
 
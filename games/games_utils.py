@@ -1,25 +1,133 @@
 
 
-def adjust_start_position(row, col, delta_row, delta_col, max_count):
+def line_windows(board_size=6, length=3):
     """
-    Adjusts the start position for checking lines based on the direction and max count.
+    Lists every line of consecutive squares on a square board: rows, columns and both diagonals.
 
     Args:
-        row (int): The row position of the last move.
-        col (int): The column position of the last move.
-        delta_row (int): Row increment for the direction.
-        delta_col (int): Column increment for the direction.
-        max_count (int): The count of consecutive cats to check for.
+        board_size (int): The number of rows (and columns) of the board.
+        length (int): The number of squares of each line.
 
     Returns:
-        Tuple of adjusted start row and column.
-    """
-    start_row, start_col = row, col
-    for _ in range(max_count - 1):
-        if 0 <= start_row - delta_row < 6 and 0 <= start_col - delta_col < 6:
-            start_row -= delta_row
-            start_col -= delta_col
-    return start_row, start_col
+        List of lines, each a list of (row, col) tuples in line order. Lines are sorted by their
+        first square, and lines starting on the same square by direction: row, column,
+        diagonal down-right and diagonal down-left.
+    """
+    windows = []
+    for row in range(board_size):
+        for col in range(board_size):
+            for delta_row, delta_col in [(0, 1), (1, 0), (1, 1), (1, -1)]:
+                end_row = row + (length - 1) * delta_row
+                end_col = col + (length - 1) * delta_col
+                if 0 <= end_row < board_size and 0 <= end_col < board_size:
+                    windows.append([(row + i * delta_row, col + i * delta_col) for i in range(length)])
+    return windows
+
+
+def lines_by_cell(lines, n_cells):
+    """
+    Indexes winning lines by the cells they contain.
+
+    Args:
+        lines (list of tuples): The cells of every winning line.
+        n_cells (int): The number of cells of the board.
+
+    Returns:
+        Tuple with, for every cell, the tuple of the indices of the lines that contain it.
+    """
+    index = [[] for _ in range(n_cells)]
+    for line_index, line in enumerate(lines):
+        for cell in line:
+            index[cell].append(line_index)
+    return tuple(tuple(line_indices) for line_indices in index)
+
+
+def line_score_table(weights):
+    """
+    Scores a winning line from the number of pieces of each player in it, for threat counting
+    evaluations: a line only counts for a player while the opponent has no piece in it.
+
+    Args:
+        weights (list of int): The value of a line holding 0, 1, 2... pieces of a single player.
+
+    Returns:
+        Table where table[count_1][count_2] is the value of a line for the first player.
+    """
+    return tuple(tuple(weights[count_1] if count_2 == 0 else -weights[count_2] if count_1 == 0 else 0
+                       for count_2 in range(len(weights)))
+                 for count_1 in range(len(weights)))
+
+
+# Inverse of every transform of square_symmetries: the quarter turns undo each other, the other
+# transforms undo themselves.
+SYMMETRY_INVERSES = (0, 3, 2, 1, 4, 5, 6, 7)
+
+
+def square_symmetries(board_size):
+    """
+    Lists the 8 rotations and reflections of a square board.
+
+    Args:
+        board_size (int): The number of rows (and columns) of the board.
+
+    Returns:
+        Tuple of 8 transforms, each the tuple of the squares (row * board_size + col) that every
+        square goes to: identity, quarter turn, half turn, three quarter turn, left-right mirror,
+        transpose, top-bottom mirror and anti-transpose.
+    """
+    last = board_size - 1
+    transforms = [
+        lambda row, col: (row, col),
+        lambda row, col: (col, last - row),
+        lambda row, col: (last - row, last - col),
+        lambda row, col: (last - col, row),
+        lambda row, col: (row, last - col),
+        lambda row, col: (col, row),
+        lambda row, col: (last - row, col),
+        lambda row, col: (last - col, last - row),
+    ]
+    return tuple(tuple(transformed[0] * board_size + transformed[1]
+                       for transformed in (transform(square // board_size, square % board_size)
+                                           for square in range(board_size * board_size)))
+                 for transform in transforms)
+
+
+def mirror_symmetries(rows, columns):
+    """
+    Lists the identity and the left-right mirror of a rectangular board, as tuples of the cells
+    (row * columns + col) that every cell goes to.
+    """
+    return (tuple(range(rows * columns)),
+            tuple(row * columns + columns - 1 - col for row in range(rows) for col in range(columns)))
+
+
+def canonical_hash(position_hash, pieces, keys, symmetries):
+    """
+    Finds the symmetric copy of a position with the smallest Zobrist hash. Only the piece keys
+    depend on the squares, so every copy is the position hash with the keys of the pieces moved.
+
+    Args:
+        position_hash (int): The hash of the position.
+        pieces (list of tuples): The (square, piece index) of every piece on the board.
+        keys (list of lists): The Zobrist keys by square and piece index.
+        symmetries (tuple of tuples): The transforms of the board, the identity first.
+
+    Returns:
+        Tuple of the smallest hash and the index of the transform that gives it.
+    """
+    base_hash = position_hash
+    for square, index in pieces:
+        base_hash ^= keys[square][index]
+
+    best_hash, best_transform = position_hash, 0
+    for transform in range(1, len(symmetries)):
+        squares = symmetries[transform]
+        symmetric_hash = base_hash
+        for square, index in pieces:
+            symmetric_hash ^= keys[squares[square]][index]
+        if symmetric_hash < best_hash:
+            best_hash, best_transform = symmetric_hash, transform
+    return best_hash, best_transform
 
 
 def create_action_dict(player, action_type, options):
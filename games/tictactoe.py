@@ -1,4 +1,25 @@
 from game import Game
+from games.games_utils import SYMMETRY_INVERSES, canonical_hash, line_score_table, lines_by_cell, square_symmetries
+from games.zobrist import zobrist_keys, zobrist_table
+
+# Zobrist keys for every (square, player) pair and for the second player to move.
+SQUARE_KEYS = zobrist_table('tictactoe', 9, 2)
+SIDE_KEY = zobrist_keys('tictactoe-side', 1)[0]
+
+# Moves are square indices, so every move is its own id.
+ALL_MOVES = list(range(9))
+
+# The squares every square goes to under the 8 rotations and reflections of the board.
+SYMMETRIES = square_symmetries(3)
+
+# The squares of every row, column and diagonal.
+LINES = [(0, 1, 2), (3, 4, 5), (6, 7, 8), (0, 3, 6), (1, 4, 7), (2, 5, 8), (0, 4, 8), (2, 4, 6)]
+LINES_BY_SQUARE = lines_by_cell(LINES, 9)
+
+# Threat counting: value of a line by the marks of the first and second player in it. The sum
+# over every line is scaled below 1, so it never outweighs a finished game.
+LINE_SCORES = line_score_table([0, 1, 4, 16])
+EVAL_SCALE = 1 / (len(LINES) * 16 + 1)
 
 
 class TicTacToe(Game):
@@ -6,7 +27,11 @@ class TicTacToe(Game):
         self.board = [' ' for _ in range(9)]
         self.current_player = 1
         self.winner = None
-        self.previous_state = None
+        self.undo_stack = []
+        self.hash = 0
+        # Marks of each player in every line and the threat score for the first player
+        self.line_counts = ([0] * len(LINES), [0] * len(LINES))
+        self.threat_score = 0
 
     def game_name(self):
         return "TicTacToe"
@@ -17,6 +42,30 @@ class TicTacToe(Game):
     def get_winner(self):
         return self.winner
 
+    def get_hash(self):
+        return self.hash
+
+    def get_canonical_hash(self):
+        pieces = [(square, 0 if letter == 'X' else 1) for square, letter in enumerate(self.board) if letter != ' ']
+        return canonical_hash(self.hash, pieces, SQUARE_KEYS, SYMMETRIES)
+
+    def transform_move(self, move, transform):
+        return SYMMETRIES[transform][move]
+
+    def untransform_move(self, move, transform):
+        return SYMMETRIES[SYMMETRY_INVERSES[transform]][move]
+
+    def all_moves(self):
+        return ALL_MOVES
+
+    def encode_move(self, move):
+        if move not in range(9):
+            raise ValueError(f"Unknown move: {move}")
+        return move
+
+    def get_available_move_ids(self):
+        return self.get_available_moves()
+
     def process_user_input(self, user_input):
 
         if not user_input.isdigit() and len(user_input) != 1:
@@ -29,7 +78,10 @@ class TicTacToe(Game):
         new_game.board = self.board[:]
         new_game.current_player = self.current_player
         new_game.winner = self.winner
-        new_game.previous_state = self.previous_state
+        new_game.undo_stack = self.undo_stack[:] if track_previous_state else []
+        new_game.hash = self.hash
+        new_game.line_counts = (self.line_counts[0][:], self.line_counts[1][:])
+        new_game.threat_score = self.threat_score
         return new_game
 
     def print_board(self):
@@ -41,8 +93,10 @@ class TicTacToe(Game):
         """Makes a move on the board. Marks the square with 'X' for first player and 'O' for second player."""
         letter = 'X' if self.current_player == 1 else 'O'
         if self.board[move] == ' ':
-            self.previous_state = self.copy()
+            self.undo_stack.append((move, self.winner))
             self.board[move] = letter
+            self.hash ^= SQUARE_KEYS[move][self.current_player - 1] ^ SIDE_KEY
+            self.update_threats(move, self.current_player, 1)
             if self.check_winner(move, letter):
                 self.winner = self.current_player
 
@@ -54,12 +108,23 @@ class TicTacToe(Game):
 
     def undo_move(self):
         """Reverts a move on the board."""
-        previous_state = self.previous_state.copy()
-        if previous_state:
-            self.board = previous_state.board
-            self.current_player = previous_state.current_player
-            self.winner = previous_state.winner
-            self.previous_state = previous_state.previous_state
+        if self.undo_stack:
+            move, self.winner = self.undo_stack.pop()
+            self.board[move] = ' '
+            self.current_player = self.next_player()
+            self.hash ^= SQUARE_KEYS[move][self.current_player - 1] ^ SIDE_KEY
+            self.update_threats(move, self.current_player, -1)
+
+    def update_threats(self, square, player, step):
+        """Adds (step 1) or removes (step -1) a mark of player in the line counts and the threat score."""
+        counts_1, counts_2 = self.line_counts
+        counts = self.line_counts[player - 1]
+        score = self.threat_score
+        for line in LINES_BY_SQUARE[square]:
+            score -= LINE_SCORES[counts_1[line]][counts_2[line]]
+            counts[line] += step
+            score += LINE_SCORES[counts_1[line]][counts_2[line]]
+        self.threat_score = score
 
     def get_available_moves(self):
         return [i for i in [4, 0, 2, 6, 8, 1, 3, 5, 7] if self.board[i] == ' ']
@@ -68,10 +133,17 @@ class TicTacToe(Game):
         return self.winner is not None or not self.empty_squares()
 
     def evaluate_game_state(self, player):
+        """
+        1 or -1 for a finished game, 0 for a draw, else the threat score: lines that only hold
+        marks of one player, weighted by how many they hold.
+        """
         if self.winner:
             return 1 if (self.winner == player) else -1
-        else:
+        elif not self.empty_squares():
             return 0
+        else:
+            score = self.threat_score * EVAL_SCALE
+            return score if player == 1 else -score
 
     def check_winner(self, square, letter):
         """Checks if the current move leads to a win."""
@@ -84,6 +156,21 @@ class TicTacToe(Game):
 
         return row_win or col_win or (square % 2 == 0 and diag_win)
 
+    def get_winning_moves(self, player):
+        """Squares that complete a line of player: lines with two of its marks and an empty square."""
+        if self.winner is not None:
+            return []
+
+        letter = 'X' if player == 1 else 'O'
+        winning_moves = []
+        for line in LINES:
+            marks = [self.board[square] for square in line]
+            if marks.count(letter) == 2 and ' ' in marks:
+                square = line[marks.index(' ')]
+                if square not in winning_moves:
+                    winning_moves.append(square)
+        return winning_moves
+
     def empty_squares(self):
         return ' ' in self.board
 
@@ -0,0 +1,49 @@
+import numpy as np
+
+from vector_env import VectorEnv
+from games.tictactoe import LINES
+
+LINE_INDICES = np.array(LINES)
+PLAYER_CODES = {' ': 0, 'X': 1, 'O': 2}
+
+
+class TicTacToeVectorEnv(VectorEnv):
+    """
+    TicTacToe boards as an (n, 9) int8 array: 0 for empty squares, else the player number.
+    Move ids are square indices, like in TicTacToe.
+    """
+
+    def __init__(self):
+        self.boards = np.zeros((0, 9), dtype=np.int8)
+        self.current_player = np.zeros(0, dtype=np.int8)
+        self.winner = np.zeros(0, dtype=np.int8)
+
+    def reset(self, n, game=None):
+        if game is None:
+            board, player, winner = [0] * 9, 1, 0
+        else:
+            board = [PLAYER_CODES[letter] for letter in game.board]
+            player, winner = game.get_current_player(), game.get_winner() or 0
+        self.boards = np.tile(np.array(board, dtype=np.int8), (n, 1))
+        self.current_player = np.full(n, player, dtype=np.int8)
+        self.winner = np.full(n, winner, dtype=np.int8)
+
+    def legal_mask(self):
+        return (self.boards == 0) & ~self.terminal()[:, None]
+
+    def step(self, actions):
+        active = np.flatnonzero(~self.terminal())
+        players = self.current_player[active]
+        self.boards[active, actions[active]] = players
+
+        # Lines of three of the player who just moved
+        lines = self.boards[active][:, LINE_INDICES]
+        won = (lines == players[:, None, None]).all(axis=2).any(axis=1)
+        self.winner[active[won]] = players[won]
+        self.current_player[active] = 3 - players
+
+    def terminal(self):
+        return (self.winner != 0) | (self.boards != 0).all(axis=1)
+
+    def reward(self, player):
+        return np.where(self.winner == player, 1, np.where(self.winner == 0, 0, -1))
@@ -0,0 +1,18 @@
+import random
+
+
+def zobrist_keys(name, count):
+    """
+    Returns count random 64-bit keys. The generator is seeded with the table name, so
+    the keys are the same in every run and in every worker process.
+    """
+    rng = random.Random(name)
+    return [rng.getrandbits(64) for _ in range(count)]
+
+
+def zobrist_table(name, n_squares, n_pieces):
+    """
+    Returns a table of random 64-bit keys indexed as table[square][piece].
+    """
+    keys = zobrist_keys(name, n_squares * n_pieces)
+    return [keys[square * n_pieces:(square + 1) * n_pieces] for square in range(n_squares)]
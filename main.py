@@ -2,17 +2,26 @@ import time
 
 from games.tictactoe import TicTacToe
 from games.connect4 import ConnectFour
+from games.connect4_bitboard import BitboardConnectFour
 from games.boop import Boop
+from games.boop_bitboard import BitboardBoop
 from games.easy_boop import EasyBoop
 from strategies.minimax import MinimaxPlayer
 from strategies.alphabeta import AlphaBetaPlayer
 from strategies.mcts import MCTSPlayer
 from strategies.mcts_solver import MCTSSolverPlayer
+from strategies.mcts_array import ArrayMCTSPlayer
+from strategies.mcts_dag import DAGMCTSPlayer
 
 
 def main():
     game = choose_game()
     players = [choose_player_type(1), choose_player_type(2)]
+    # Against a human, the MCTS players go on searching while the human thinks
+    if 'human' in players:
+        for player in players:
+            if hasattr(player, 'ponder'):
+                player.ponder = True
     player_duration = [0] * len(players)
 
     while not game.is_game_over():
@@ -41,6 +50,8 @@ def main():
 
             print(f'Move Player {turn} ({player.algorithm_name()}): {move}')
             print(f'{player.algorithm_name()} strategy used {n} iterations and took {duration:.6f} seconds')
+            if player.search_stats is not None:
+                print(f'Search stats: {player.search_stats.to_json()}')
             game.make_move(move)
             update_players(players, move)
 
@@ -72,7 +83,7 @@ def get_player_move(game):
             user_input = input(f'Move Player {game.get_current_player()}: ')
             move = game.process_user_input(user_input)
 
-            if move in game.get_available_moves():
+            if game.encode_move(move) in game.get_available_move_ids():
                 return move
             else:
                 print("Invalid movement. Try again!")
@@ -85,7 +96,7 @@ def choose_game():
     while True:
         try:
             choice = int(input("Which game would you like to play?\n 1: TicTacToe\n 2: Connect4\n"
-                               " 3: EasyBoop\n 4: Boop\n"))
+                               " 3: EasyBoop\n 4: Boop\n 5: Connect4 (Bitboard)\n 6: Boop (Bitboard)\n"))
             if choice == 1:
                 return TicTacToe()
             elif choice == 2:
@@ -94,6 +105,10 @@ def choose_game():
                 return EasyBoop()
             elif choice == 4:
                 return Boop()
+            elif choice == 5:
+                return BitboardConnectFour()
+            elif choice == 6:
+                return BitboardBoop()
             else:
                 print("Invalid choice. Please try again.")
         except ValueError:
@@ -104,18 +119,20 @@ def choose_player_type(player_number):
     while True:
         try:
             choice = int(input(f"Choose the type of player {player_number}:\n 1: Human\n 2: Minimax\n 3: AlphaBeta\n "
-                               f"4: MTCS\n 5: MTCS-Solver\n"))
+                               f"4: MTCS\n 5: MTCS-Solver\n 6: MCTS-Array\n 7: MCTS-DAG\n"))
             if choice == 1:
                 # Human Player
                 return 'human'
             elif choice == 2:
                 # Minimax Player
                 depth_limit = choose_depth_or_time(player_number)
-                return MinimaxPlayer(depth_limit, player=player_number)
+                time_limit = choose_depth_or_time(player_number, 'time (0 for no limit)')
+                return MinimaxPlayer(depth_limit, player=player_number, time_limit=time_limit or None)
             elif choice == 3:
                 # AlphaBeta Player
                 depth_limit = choose_depth_or_time(player_number)
-                return AlphaBetaPlayer(depth_limit, player=player_number)
+                time_limit = choose_depth_or_time(player_number, 'time (0 for no limit)')
+                return AlphaBetaPlayer(depth_limit, player=player_number, time_limit=time_limit or None)
             elif choice == 4:
                 # MCTS Player
                 time_limit = choose_depth_or_time(player_number, 'time')
@@ -125,6 +142,14 @@ def choose_player_type(player_number):
                 depth_limit = choose_depth_or_time(player_number, 'depth')
                 time_limit = choose_depth_or_time(player_number, 'time')
                 return MCTSSolverPlayer(depth_limit, time_limit, player=player_number)
+            elif choice == 6:
+                # MCTS Player on a compact array-backed tree
+                time_limit = choose_depth_or_time(player_number, 'time')
+                return ArrayMCTSPlayer(time_limit, player=player_number)
+            elif choice == 7:
+                # MCTS Player sharing nodes between transpositions
+                time_limit = choose_depth_or_time(player_number, 'time')
+                return DAGMCTSPlayer(time_limit, player=player_number)
             else:
                 print("Invalid choice. Please try again.")
         except ValueError:
@@ -0,0 +1,245 @@
+"""
+Perft benchmark for the move generation of every game.
+
+Counts the leaf nodes of the game tree to a given depth, using get_available_moves,
+make_move_unchecked (as the searches do) and undo_move only, and reports nodes per second.
+A second pass checks that every make/undo pair restores the exact previous state, and the
+bitboard games play random games side by side with the implementation they replace, which
+must agree on every position. Results are written to a JSON file so they can be compared
+between commits. Example:
+
+    python perft.py --games connect4 boop --output perft_results.json
+"""
+import argparse
+import copy
+import json
+import platform
+import random
+import subprocess
+import time
+
+from games.tictactoe import TicTacToe
+from games.connect4 import ConnectFour
+from games.connect4_bitboard import BitboardConnectFour
+from games.easy_boop import EasyBoop
+from games.boop import Boop
+from games.boop_bitboard import BitboardBoop
+
+# Game class and default depth of every benchmarked game
+GAMES = {
+    'tictactoe': (TicTacToe, 6),
+    'connect4': (ConnectFour, 5),
+    'connect4-bitboard': (BitboardConnectFour, 5),
+    'easyboop': (EasyBoop, 3),
+    'boop': (Boop, 2),
+    'boop-bitboard': (BitboardBoop, 2),
+}
+
+# Positions to benchmark besides the starting one, as the moves that reach them
+POSITIONS = {
+    'tictactoe': {
+        'opening': [4, 0],
+        'midgame': [4, 0, 2, 6],
+    },
+    'connect4': {
+        'opening': [3, 3, 2, 4],
+        'midgame': [3, 3, 3, 3, 2, 4, 4, 2, 1, 5],
+    },
+    'easyboop': {
+        'opening': [(2, 2), (3, 3)],
+        'midgame': [(2, 2), (3, 3), (1, 4), (4, 1), (0, 0), (5, 5)],
+    },
+    'boop': {
+        'opening': [('Move Small', [(2, 2)]), ('Move Small', [(3, 3)])],
+        'midgame': [('Move Small', [(2, 2)]), ('Move Small', [(3, 3)]), ('Move Small', [(1, 4)]),
+                    ('Move Small', [(4, 1)]), ('Move Small', [(0, 0)]), ('Move Small', [(5, 5)])],
+    },
+}
+POSITIONS['connect4-bitboard'] = POSITIONS['connect4']
+POSITIONS['boop-bitboard'] = POSITIONS['boop']
+
+# Leaf counts (finished games included) from the starting position; a different count means the rules changed
+EXPECTED_NODES = {
+    'tictactoe': [1, 9, 72, 504, 3024, 15120, 56160, 154944, 255168, 255168],
+    'connect4': [1, 7, 49, 343, 2401, 16807, 117649],
+    'easyboop': [1, 36, 1260, 42900],
+    'boop': [1, 36, 1260, 42900],
+}
+EXPECTED_NODES['connect4-bitboard'] = EXPECTED_NODES['connect4']
+EXPECTED_NODES['boop-bitboard'] = EXPECTED_NODES['boop']
+
+# Games that must behave exactly like another implementation of the same rules
+REFERENCE_GAMES = {
+    'connect4-bitboard': 'connect4',
+    'boop-bitboard': 'boop',
+}
+
+# Attributes that only exist to undo moves, and can differ after an undo_move
+UNDO_BOOKKEEPING = {'undo_stack', 'moves_played', 'move_log', 'changed_squares'}
+
+
+def perft(game, depth):
+    """Counts the leaf nodes (positions at depth, or finished games before it) below game."""
+    if depth == 0 or game.is_game_over():
+        return 1
+
+    nodes = 0
+    for move in game.get_available_moves():
+        game.make_move_unchecked(move)
+        nodes += perft(game, depth - 1)
+        game.undo_move()
+    return nodes
+
+
+def state_snapshot(game):
+    """A deep copy of the attributes that describe the position."""
+    return copy.deepcopy({key: value for key, value in vars(game).items() if key not in UNDO_BOOKKEEPING})
+
+
+def check_make_undo(game, depth, path=()):
+    """
+    Walks the tree like perft, checking that undo_move restores the state from before make_move.
+
+    Raises:
+        AssertionError: With the moves leading to the first position that isn't restored.
+    """
+    if depth == 0 or game.is_game_over():
+        return
+
+    before = state_snapshot(game)
+    for move in game.get_available_moves():
+        game.make_move_unchecked(move)
+        check_make_undo(game, depth - 1, path + (move,))
+        game.undo_move()
+        after = state_snapshot(game)
+        if after != before:
+            changed = sorted(key for key in before if before[key] != after.get(key))
+            raise AssertionError(f"undo_move of {move} after {list(path)} changed: {', '.join(changed)}")
+
+
+def position_description(game):
+    """What two implementations of the same rules must agree on after every move."""
+    description = {
+        'board': game.board,
+        'player': game.get_current_player(),
+        'winner': game.get_winner(),
+        'game_over': game.is_game_over(),
+        'hash': game.get_hash(),
+        # In any order: Boop lists the cats to change in the order they were played, BitboardBoop by square
+        'moves': sorted(map(repr, game.get_available_moves())),
+    }
+    if hasattr(game, 'pieces_in_hand'):
+        description['pieces_in_hand'] = [game.pieces_in_hand(index) for index in range(4)]
+    return description
+
+
+def check_equivalence(game_name, n_games, seed=0, undo_rate=0.1):
+    """
+    Plays n_games random games on a game and on its reference implementation at once, undoing
+    a move now and then, and checks that both describe every position alike.
+
+    Raises:
+        AssertionError: With the moves leading to the first position where they differ.
+    """
+    game_class, _ = GAMES[game_name]
+    reference_class, _ = GAMES[REFERENCE_GAMES[game_name]]
+    rng = random.Random(seed)
+
+    for _ in range(n_games):
+        game, reference = game_class(), reference_class()
+        path = []
+        while not reference.is_game_over():
+            if path and rng.random() < undo_rate:
+                game.undo_move()
+                reference.undo_move()
+                path.append('undo')
+            else:
+                move = rng.choice(reference.get_available_moves())
+                game.make_move(move)
+                reference.make_move(move)
+                path.append(move)
+
+            description, expected = position_description(game), position_description(reference)
+            if description != expected:
+                changed = sorted(key for key in expected if description[key] != expected[key])
+                raise AssertionError(f"{game_name} differs from {REFERENCE_GAMES[game_name]} in "
+                                     f"{', '.join(changed)} after {path}")
+
+
+def setup_position(game_class, moves):
+    game = game_class()
+    for move in moves:
+        if not game.make_move(move):
+            raise ValueError(f"Invalid stored position: {move} in {moves}")
+    return game
+
+
+def benchmark(game_name, depth, check_depth):
+    """Runs perft and the make/undo check from the start and from every stored position."""
+    game_class, _ = GAMES[game_name]
+    positions = {'start': []}
+    positions.update(POSITIONS.get(game_name, {}))
+
+    results = []
+    for position_name, moves in positions.items():
+        game = setup_position(game_class, moves)
+
+        start_time = time.perf_counter()
+        nodes = perft(game, depth)
+        seconds = time.perf_counter() - start_time
+
+        expected = EXPECTED_NODES.get(game_name, [])
+        if position_name == 'start' and depth < len(expected) and nodes != expected[depth]:
+            raise AssertionError(f"{game_name} perft({depth}) = {nodes}, expected {expected[depth]}")
+
+        check_make_undo(game, min(depth, check_depth))
+
+        results.append({
+            'game': game_name,
+            'position': position_name,
+            'depth': depth,
+            'nodes': nodes,
+            'seconds': seconds,
+            'nodes_per_second': nodes / seconds if seconds else 0.0,
+            'make_undo_checked_depth': min(depth, check_depth),
+        })
+    return results
+
+
+def current_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Perft benchmark and make/undo consistency check.")
+    parser.add_argument('--games', nargs='+', choices=sorted(GAMES), default=sorted(GAMES))
+    parser.add_argument('--depth', type=int, default=None, help="Depth for every game (default: per game)")
+    parser.add_argument('--check-depth', type=int, default=2, help="Depth of the make/undo consistency check")
+    parser.add_argument('--equivalence-games', type=int, default=100,
+                        help="Random games played against the reference implementation of the bitboard games")
+    parser.add_argument('--output', default='perft_results.json')
+    args = parser.parse_args()
+
+    results = []
+    for game_name in args.games:
+        depth = args.depth if args.depth is not None else GAMES[game_name][1]
+        for result in benchmark(game_name, depth, args.check_depth):
+            print(f"{result['game']:>18} {result['position']:>8} depth {result['depth']}: {result['nodes']:>9} nodes "
+                  f"in {result['seconds']:.3f} s ({result['nodes_per_second']:.0f} nodes/s)")
+            results.append(result)
+
+        if game_name in REFERENCE_GAMES:
+            check_equivalence(game_name, args.equivalence_games)
+            print(f"{game_name:>18} matches {REFERENCE_GAMES[game_name]} over {args.equivalence_games} random games")
+
+    with open(args.output, 'w') as output:
+        json.dump({'commit': current_commit(), 'python': platform.python_version(), 'results': results},
+                  output, indent=2)
+    print(f'Results written to {args.output}')
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,256 @@
+"""
+Self-play data generation for training evaluators offline.
+
+Plays games between two copies of an MCTS configuration in a pool of worker processes and
+streams one record per searched position into compressed binary shards:
+
+    python selfplay.py connect4 mcts:time=0.1 --games 10000 --output selfplay_data
+
+Every record holds the encoded position (player to move, board and, for Boop, the pending
+decision and the cats in hand), the visit count of every move id at the root of the search, and
+the final result for the player to move. Records have a fixed size, are packed into
+zlib-compressed blocks, and blocks are appended to shard files of at most --shard-records
+records. index.json describes the record layout and where every block is, and is rewritten
+whenever a shard is closed, so the data of a run can be read while it goes on.
+read_records memory-maps the shards and decompresses one block at a time.
+"""
+import argparse
+import json
+import mmap
+import os
+import random
+import struct
+import zlib
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from main import update_players
+from arena import GAMES, create_player, parse_player_spec
+from games.boop import Boop
+
+# Strategies whose search tree root (and its children's visit counts) is kept after choosing a move
+TREE_STRATEGIES = ('mcts', 'mcts-solver')
+
+# Byte of every board letter in encoded positions: empty, first player's pieces, second
+# player's pieces, and the big cats of Boop.
+LETTER_CODES = {' ': 0, 'X': 1, 'a': 1, 'O': 2, 'b': 2, 'A': 3, 'B': 4}
+
+INDEX_FILE = 'index.json'
+
+
+def encode_position(game):
+    """
+    Encodes a position as bytes: the player to move followed by the board, row by row. Boop
+    positions (Boop and BitboardBoop) go on with the pending decision, 0 to place a cat or 1 to
+    choose cats to change, and the cats in hand of every kind, in pieces_in_hand order.
+    """
+    board = game.board
+    cells = board if isinstance(board[0], str) else [letter for row in board for letter in row]
+    position = [game.get_current_player()] + [LETTER_CODES[letter] for letter in cells]
+    if hasattr(game, 'pieces_in_hand'):
+        position.append(int(game.next_states[0]['type'] == Boop.CHANGE_CATS))
+        position.extend(game.pieces_in_hand(index) for index in range(4))
+    return bytes(position)
+
+
+def record_format(game):
+    """The struct format of the records of a game: position bytes, result and visits per move id."""
+    return f'<{len(encode_position(game))}sb{len(game.all_moves())}I'
+
+
+def root_visits(player, game):
+    """
+    Returns the visit count of every move id at the root of the last search of player, or None
+    if the search didn't visit any move (a single legal move or an immediate win).
+    """
+    visits = [0] * len(game.all_moves())
+    for child in player.root.children:
+        visits[game.encode_move(child.move)] = child.visits
+    return visits if any(visits) else None
+
+
+def play_selfplay_game(game_name, spec, seed, max_moves):
+    """
+    Plays one self-play game and returns its packed records, one per position where the
+    search visited some move.
+    """
+    random.seed(seed)
+    game = GAMES[game_name]()
+    players = [create_player(spec, number) for number in (1, 2)]
+    record_struct = struct.Struct(record_format(game))
+
+    positions = []
+    n_moves = 0
+    while not game.is_game_over() and n_moves < max_moves:
+        turn = game.get_current_player()
+        player = players[turn - 1]
+        move, _ = player.choose_move(game)
+
+        visits = root_visits(player, game) if player.root is not None else None
+        if visits is not None:
+            positions.append((encode_position(game), turn, visits))
+
+        game.make_move(move)
+        update_players(players, move)
+        n_moves += 1
+
+    for player in players:
+        if hasattr(player, 'close'):
+            player.close()
+
+    winner = game.get_winner()
+    return [record_struct.pack(position, 0 if winner is None else (1 if winner == turn else -1), *visits)
+            for position, turn, visits in positions]
+
+
+class ShardWriter:
+    """
+    Appends records to compressed shards. Only the records of the current block are kept in
+    memory; full blocks are compressed and written right away.
+    """
+
+    def __init__(self, directory, game_name, spec, record_format, shard_records=100000, block_records=1024):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.shard_records = shard_records
+        self.block_records = block_records
+        self.index = {
+            'game': game_name,
+            'player': spec,
+            'record_format': record_format,
+            'record_size': struct.calcsize(record_format),
+            'records': 0,
+            'shards': [],
+        }
+        self.block = []
+        self.shard_file = None
+        self.shard = None
+
+    def write(self, record):
+        self.block.append(record)
+        if len(self.block) == self.block_records:
+            self.flush_block()
+
+    def flush_block(self):
+        """Compresses the pending records into a block of the current shard, opening one if needed."""
+        if not self.block:
+            return
+
+        if self.shard_file is None:
+            name = f'shard_{len(self.index["shards"]):05d}.bin'
+            self.shard_file = open(os.path.join(self.directory, name), 'wb')
+            self.shard = {'file': name, 'records': 0, 'blocks': []}
+
+        data = zlib.compress(b''.join(self.block))
+        self.shard['blocks'].append([self.shard_file.tell(), len(data), len(self.block)])
+        self.shard_file.write(data)
+        self.shard['records'] += len(self.block)
+        self.block = []
+
+        if self.shard['records'] >= self.shard_records:
+            self.close_shard()
+
+    def close_shard(self):
+        """Closes the current shard and adds it to the index."""
+        if self.shard_file is None:
+            return
+
+        self.shard_file.close()
+        self.index['shards'].append(self.shard)
+        self.index['records'] += self.shard['records']
+        self.shard_file = None
+        self.shard = None
+        self.write_index()
+
+    def write_index(self):
+        # Written aside and renamed, so readers never see a half-written index
+        path = os.path.join(self.directory, INDEX_FILE)
+        with open(path + '.tmp', 'w') as index_file:
+            json.dump(self.index, index_file)
+        os.replace(path + '.tmp', path)
+
+    def close(self):
+        self.flush_block()
+        self.close_shard()
+        self.write_index()
+
+
+def read_records(directory):
+    """
+    Yields the (position bytes, result, visits) records of a self-play directory. Shards are
+    memory-mapped and decompressed one block at a time, so memory use doesn't depend on the
+    size of the data.
+    """
+    with open(os.path.join(directory, INDEX_FILE)) as index_file:
+        index = json.load(index_file)
+
+    record_struct = struct.Struct(index['record_format'])
+    for shard in index['shards']:
+        with open(os.path.join(directory, shard['file']), 'rb') as shard_file, \
+                mmap.mmap(shard_file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            for offset, length, _ in shard['blocks']:
+                for position, result, *visits in record_struct.iter_unpack(zlib.decompress(data[offset:offset + length])):
+                    yield position, result, visits
+
+
+def run_selfplay(game_name, spec, directory, n_games, workers=None, max_moves=500, seed=None,
+                 shard_records=100000, block_records=1024):
+    """
+    Plays n_games self-play games and writes their records to directory. At most two games per
+    worker are in flight, so memory stays flat however many games are played. Returns the
+    number of records written.
+
+    Raises:
+        ValueError: If the spec is unknown or its strategy doesn't keep a search tree.
+    """
+    name, kwargs = parse_player_spec(spec)
+    if name not in TREE_STRATEGIES:
+        raise ValueError(f"Self-play needs a strategy with a search tree: {', '.join(TREE_STRATEGIES)}")
+    if kwargs.get('workers', 1) > 1:
+        raise ValueError("Root parallel players don't keep a search tree, play several games at once instead")
+
+    rng = random.Random(seed)
+    writer = ShardWriter(directory, game_name, spec, record_format(GAMES[game_name]()), shard_records, block_records)
+
+    max_pending = 2 * (workers or os.cpu_count() or 1)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = set()
+        submitted = 0
+        while submitted < n_games or pending:
+            while submitted < n_games and len(pending) < max_pending:
+                pending.add(executor.submit(play_selfplay_game, game_name, spec, rng.getrandbits(64), max_moves))
+                submitted += 1
+
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                for record in future.result():
+                    writer.write(record)
+
+    writer.close()
+    return writer.index['records']
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate self-play training data.")
+    parser.add_argument('game', choices=sorted(GAMES))
+    parser.add_argument('player', help=f"Player spec for both sides, e.g. 'mcts:time=0.1'. "
+                                       f"Strategies: {', '.join(TREE_STRATEGIES)}")
+    parser.add_argument('--games', type=int, default=100)
+    parser.add_argument('--workers', type=int, default=None, help="Worker processes (default: one per core)")
+    parser.add_argument('--max-moves', type=int, default=500, help="Moves after which a game is a draw")
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--shard-records', type=int, default=100000, help="Records per shard file")
+    parser.add_argument('--block-records', type=int, default=1024, help="Records per compressed block")
+    parser.add_argument('--output', default='selfplay_data')
+    args = parser.parse_args()
+
+    try:
+        n_records = run_selfplay(args.game, args.player, args.output, args.games, args.workers, args.max_moves,
+                                 args.seed, args.shard_records, args.block_records)
+    except ValueError as e:
+        parser.error(str(e))
+
+    print(f"{n_records} records written to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,62 +1,289 @@
+import time
+
 from botPlayer import BotPlayer
+from strategies.search_control import SearchTimeout, search_deadline
+from strategies.search_stats import SearchStats
+from strategies.transposition import TranspositionTable
 
 
 class AlphaBetaPlayer(BotPlayer):
-    def __init__(self, depth_limit=5, player=2):
+    # Late move reductions: from this move on, quiet moves with at least this depth left
+    # below them are first searched one ply shallower.
+    LMR_FULL_MOVES = 3
+    LMR_MIN_DEPTH = 3
+    KILLERS_PER_PLY = 2
+
+    def __init__(self, depth_limit=5, player=2, time_limit=None, tt_size=2 ** 18, move_ordering=True):
+        """
+        With a time_limit (in seconds) the search deepens one ply at a time, up to depth_limit,
+        and plays the best move of the deepest iteration finished in time.
+        With move_ordering, killer moves and the history heuristic order the moves of every
+        node and late quiet moves are searched with reduced depth.
+        """
         self.depth_limit = depth_limit
+        self.move_ordering = move_ordering
+        self.killer_moves = {}
+        self.history = {}
+        self.time_limit = time_limit
         self.player = player
+        # Kept for the whole game, so results from previous moves are reused
+        self.transposition_table = TranspositionTable(tt_size)
+        self.search_stats = None
+        self.search_depth = depth_limit
+        self.deadline = None
+        self.stop = None
+        self.principal_variation = []
 
     def algorithm_name(self):
         return "AlphaBeta"
 
-    def choose_move(self, game):
+    def choose_move(self, game, stop=None):
+        stats = SearchStats(self.algorithm_name())
+        self.stop = stop
+        self.transposition_table.new_search()
+        self.principal_variation = []
+        self.killer_moves = {}
+        # Older history counts fade so they don't outweigh what is learnt in this search
+        self.history = {key: value // 2 for key, value in self.history.items() if value > 1}
+
+        # A search that can be stopped deepens iteratively, so it always has a move to return
+        if self.time_limit is None and stop is None:
+            self.deadline = None
+            best_move, _, total_calls = self.search_root(game, self.depth_limit)
+            depth_reached = self.depth_limit
+        else:
+            best_move, total_calls, depth_reached = self.iterative_deepening(game)
+
+        stats.nodes = total_calls
+        stats.max_depth = depth_reached
+        stats.add_table_stats(self.transposition_table)
+        self.search_stats = stats.finish()
+        return best_move, total_calls
+
+    def iterative_deepening(self, game):
+        """
+        Searches with increasing depth until the time budget runs out or the search is stopped,
+        reusing the principal variation of each finished iteration to order the moves of the
+        next one.
+        """
+        self.deadline = search_deadline(self.time_limit, self.stop)
+        best_move = None
+        depth_reached = -1
+        total_calls = 0
+
+        for depth in range(self.depth_limit + 1):
+            try:
+                move, score, n_calls = self.search_root(game, depth)
+            except SearchTimeout as timeout:
+                total_calls += timeout.args[0]
+                break
+
+            total_calls += n_calls
+            best_move, depth_reached = move, depth
+            self.principal_variation = self.extract_principal_variation(game, depth + 1)
+
+            # A forced win can't get any better
+            if score >= 1:
+                break
+
+        if best_move is None:
+            best_move = game.get_available_moves()[0]
+
+        return best_move, total_calls, depth_reached
+
+    def search_root(self, game, depth):
+        self.search_depth = depth
         alpha = float('-inf')
         beta = float('inf')
         best_move = None
         total_calls = 0
 
-        for move in game.get_available_moves():
-            game.make_move(move)
-            score, n_calls = self.alphabeta(game, 0, False, alpha, beta)
+        key = self.position_key(game, True)
+        moves, _ = self.order_moves(game, self.transposition_table.probe(key), 0)
+
+        for move in moves:
+            game.make_move_unchecked(move)
+            try:
+                score, n_calls = self.alphabeta(game, 1, depth, False, alpha, beta)
+            except SearchTimeout:
+                raise SearchTimeout(total_calls)
+            finally:
+                game.undo_move()
             # print(f'Move:{move}-> score:{score}')
             total_calls += n_calls
-            game.undo_move()
             if score > alpha:
                 alpha = score
                 best_move = move
 
-        return best_move, total_calls
+        if best_move is not None:
+            self.transposition_table.store(key, depth + 1, TranspositionTable.EXACT, alpha, best_move)
+
+        return best_move, alpha, total_calls
 
-    def alphabeta(self, game, depth, is_maximizing_player, alpha, beta):
+    def alphabeta(self, game, ply, remaining_depth, is_maximizing_player, alpha, beta):
+        """
+        Searches a node ply moves away from the root, remaining_depth more plies deep. Late move
+        reductions only lower remaining_depth, so ply always indexes the killer moves and the
+        principal variation of the node's real ply.
+        """
         n_calls = 1
-        if depth == self.depth_limit or game.is_game_over():
+        if remaining_depth <= 0 or game.is_game_over():
             return game.evaluate_game_state(self.player), n_calls
 
+        if (self.deadline is not None and time.time() > self.deadline) or \
+                (self.stop is not None and self.stop.stopped):
+            raise SearchTimeout()
+
+        # Results are only reused when they were searched at least as deep as needed here
+        key = self.position_key(game, is_maximizing_player)
+        entry = self.transposition_table.probe(key)
+        if entry is not None and entry[1] >= remaining_depth:
+            _, _, flag, score, _, _ = entry
+            if flag == TranspositionTable.EXACT:
+                return score, n_calls
+            elif flag == TranspositionTable.LOWER_BOUND:
+                alpha = max(alpha, score)
+            else:
+                beta = min(beta, score)
+            if beta <= alpha:
+                return score, n_calls
+
+        alpha_start, beta_start = alpha, beta
+        best_move = None
+
+        moves, n_ordered = self.order_moves(game, entry, ply)
+        reduce_late_moves = self.move_ordering and remaining_depth >= self.LMR_MIN_DEPTH
+        first_late_move = max(n_ordered, self.LMR_FULL_MOVES)
+
         if is_maximizing_player:
-            max_eval = float('-inf')
-            for move in game.get_available_moves():
-                game.make_move(move)
-                eval_score, n = self.alphabeta(game, depth + 1, False, alpha, beta)
+            best_eval = float('-inf')
+            for index, move in enumerate(moves):
+                game.make_move_unchecked(move)
+                try:
+                    late_move = reduce_late_moves and index >= first_late_move
+                    eval_score, n = self.search_child(game, ply, remaining_depth, True, alpha, beta, late_move)
+                finally:
+                    game.undo_move()
                 n_calls += n
-                game.undo_move()
-                max_eval = max(max_eval, eval_score)
+                if eval_score > best_eval:
+                    best_eval = eval_score
+                    best_move = move
                 alpha = max(alpha, eval_score)
                 if beta <= alpha:
+                    self.record_cutoff(game.encode_move(move), ply, remaining_depth)
                     break
-            return max_eval, n_calls
         else:
-            min_eval = float('inf')
-            for move in game.get_available_moves():
-                game.make_move(move)
-                eval_score, n = self.alphabeta(game, depth + 1, True, alpha, beta)
+            best_eval = float('inf')
+            for index, move in enumerate(moves):
+                game.make_move_unchecked(move)
+                try:
+                    late_move = reduce_late_moves and index >= first_late_move
+                    eval_score, n = self.search_child(game, ply, remaining_depth, False, alpha, beta, late_move)
+                finally:
+                    game.undo_move()
                 n_calls += n
-                game.undo_move()
-                min_eval = min(min_eval, eval_score)
+                if eval_score < best_eval:
+                    best_eval = eval_score
+                    best_move = move
                 beta = min(beta, eval_score)
                 if beta <= alpha:
+                    self.record_cutoff(game.encode_move(move), ply, remaining_depth)
                     break
-            return min_eval, n_calls
+
+        if best_eval <= alpha_start:
+            flag = TranspositionTable.UPPER_BOUND
+        elif best_eval >= beta_start:
+            flag = TranspositionTable.LOWER_BOUND
+        else:
+            flag = TranspositionTable.EXACT
+        self.transposition_table.store(key, remaining_depth, flag, best_eval, best_move)
+
+        return best_eval, n_calls
+
+    def search_child(self, game, ply, remaining_depth, is_maximizing_player, alpha, beta, late_move):
+        """
+        Searches the position reached by a move from a node at the given ply, with
+        remaining_depth plies left below that node. Late moves are searched one ply shallower
+        first, and again at full depth only if they would improve the bound of the node.
+        """
+        if not late_move:
+            return self.alphabeta(game, ply + 1, remaining_depth - 1, not is_maximizing_player, alpha, beta)
+
+        eval_score, n_calls = self.alphabeta(game, ply + 1, remaining_depth - 2, not is_maximizing_player, alpha, beta)
+        if (eval_score <= alpha) if is_maximizing_player else (eval_score >= beta):
+            return eval_score, n_calls
+
+        eval_score, n = self.alphabeta(game, ply + 1, remaining_depth - 1, not is_maximizing_player, alpha, beta)
+        return eval_score, n_calls + n
+
+    def record_cutoff(self, move_id, ply, remaining_depth):
+        """Remembers the id of a move that caused a cutoff as a killer for its ply and in the history table."""
+        if not self.move_ordering:
+            return
+
+        killers = self.killer_moves.setdefault(ply, [])
+        if move_id not in killers:
+            killers.insert(0, move_id)
+            del killers[self.KILLERS_PER_PLY:]
+        self.history[move_id] = self.history.get(move_id, 0) + remaining_depth * remaining_depth
+
+    def extract_principal_variation(self, game, max_length):
+        """Follows the best moves stored in the transposition table from the current position."""
+        variation = []
+        is_maximizing_player = True
+        while len(variation) < max_length and not game.is_game_over():
+            entry = self.transposition_table.probe(self.position_key(game, is_maximizing_player))
+            if entry is None or entry[4] is None or entry[4] not in game.get_available_moves():
+                break
+            variation.append(entry[4])
+            game.make_move_unchecked(entry[4])
+            is_maximizing_player = not is_maximizing_player
+
+        for _ in variation:
+            game.undo_move()
+        return variation
+
+    @staticmethod
+    def position_key(game, is_maximizing_player):
+        """
+        The same position can be reached as a max or a min node (Boop turns don't always
+        alternate), so the node type is part of the key.
+        """
+        return (game.get_hash() << 1) | is_maximizing_player
+
+    def order_moves(self, game, entry, ply):
+        """
+        Orders the moves of a node: the move of the previous principal variation at this ply,
+        the best move stored in the transposition table, the killer moves of the ply and then
+        the rest by history score. Ties keep the order of get_available_moves. The ordering
+        works on move ids, so comparisons are between integers.
+
+        Returns the ordered moves and how many of them were placed first for a specific
+        reason; the rest are considered quiet.
+        """
+        move_ids = game.get_available_move_ids()
+        first_ids = []
+        if ply < len(self.principal_variation):
+            first_ids.append(game.encode_move(self.principal_variation[ply]))
+        if entry is not None and entry[4] is not None:
+            first_ids.append(game.encode_move(entry[4]))
+
+        if self.move_ordering:
+            if self.history:
+                move_ids.sort(key=lambda move_id: -self.history.get(move_id, 0))
+            killers = self.killer_moves.get(ply, ())
+            first_ids.extend(move_id for move_id in move_ids if move_id in killers)
+
+        n_ordered = 0
+        for move_id in reversed(first_ids):
+            if move_id in move_ids:
+                move_ids.remove(move_id)
+                move_ids.insert(0, move_id)
+        for move_id in move_ids:
+            if move_id not in first_ids:
+                break
+            n_ordered += 1
+        return [game.decode_move(move_id) for move_id in move_ids], n_ordered
 
     def update(self, _move):
         return
-
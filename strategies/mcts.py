@@ -3,20 +3,35 @@ import random
 import math
 
 from botPlayer import BotPlayer
+from strategies.playout import heavy_playout_move, random_playout_move
+from strategies.root_parallel import RootParallelSearch, find_immediate_win, worker_time_limit
+from strategies.pondering import Pondering
+from strategies.search_control import search_deadline, search_stopped
+from strategies.search_stats import SearchStats
+from strategies.tree_memory import reroot_tree
+from vector_env import check_vector_env, make_vector_env
 
 
 class MCTSNode:
-    def __init__(self, game_state, parent=None, move=None):
-        self.game_state = game_state
+    # Trees get big: nodes have slots and don't keep game_state, which would keep a whole game alive per node
+    __slots__ = ('parent', 'move', 'move_id', 'children', 'wins', 'visits', 'untried_moves', 'player_to_move',
+                 'amaf')
+
+    def __init__(self, game_state, parent=None, move=None, move_id=None):
         self.parent = parent
         self.move = move
+        self.move_id = move_id
         self.children = []
         self.wins = 0
         self.visits = 0
         self.untried_moves = game_state.get_available_moves()
+        # game_state keeps changing after the node is created, so the player is read now
+        self.player_to_move = game_state.get_current_player()
+        # All-moves-as-first statistics, move id -> [wins, visits], only filled in RAVE mode
+        self.amaf = {}
 
-    def add_child(self, move, game_state):
-        new_node = MCTSNode(game_state, parent=self, move=move)
+    def add_child(self, move, game_state, move_id=None):
+        new_node = MCTSNode(game_state, parent=self, move=move, move_id=move_id)
         self.untried_moves.remove(move)
         self.children.append(new_node)
         return new_node
@@ -24,77 +39,287 @@ class MCTSNode:
     def is_fully_expanded(self):
         return len(self.untried_moves) == 0
 
-    def best_child(self, c_param=1.4):
-        choices_weights = [
-            (child.wins / child.visits) + c_param * (2 * math.log(self.visits) / child.visits) ** 0.5
-            for child in self.children
-        ]
+    def best_child(self, c_param=1.4, rave_equivalence=None, player=None):
+        """
+        Win ratios are taken from the point of view of the player to move, wins being counted
+        for player (the player to move when None).
+        With a rave_equivalence k, the win ratio of each child is blended with the AMAF ratio of
+        its move, weighted by beta = sqrt(k / (3 * visits + k)): AMAF dominates while the child
+        has few visits and fades out once it has many more than k.
+        """
+        sign = 1 if player is None or self.player_to_move == player else -1
+        log_visits = 2 * math.log(self.visits)
+        if rave_equivalence is None:
+            choices_weights = [
+                sign * (child.wins / child.visits) + c_param * (log_visits / child.visits) ** 0.5
+                for child in self.children
+            ]
+        else:
+            amaf = self.amaf
+            choices_weights = []
+            for child in self.children:
+                value = child.wins / child.visits
+                move_stats = amaf.get(child.move_id)
+                if move_stats is not None:
+                    beta = (rave_equivalence / (3 * child.visits + rave_equivalence)) ** 0.5
+                    value += beta * (move_stats[0] / move_stats[1] - value)
+                choices_weights.append(sign * value + c_param * (log_visits / child.visits) ** 0.5)
         return self.children[choices_weights.index(max(choices_weights))]
 
 
 class MCTSPlayer(BotPlayer):
-    def __init__(self, time_limit=5, player=2):
+    def __init__(self, time_limit=5, player=2, workers=1, rave=False, rave_equivalence=100,
+                 rave_exploration=0.4, heavy_playouts=False, batch_playouts=0, ponder=False, max_nodes=None):
+        """
+        With more than one worker, every move runs that many independent searches in parallel
+        processes and merges their root statistics (root parallelization).
+        With rave, every node also keeps all-moves-as-first (AMAF) statistics: each simulation
+        counts for every move that the player to move at the node played later on, as if it
+        had been played first. Selection blends them with the win ratio of each child, trusting
+        them less as the child gets visits; rave_equivalence sets how fast (see best_child).
+        The AMAF statistics already spread the simulations over the moves, so selection uses
+        rave_exploration instead of the usual exploration constant of 1.4.
+        With heavy_playouts, simulations play immediate wins and block immediate losses instead
+        of moving at random (see heavy_playout_move).
+        With batch_playouts, every simulation is that many random games played at once in a
+        NumPy vector environment (TicTacToe, Connect4 and Boop only), and backpropagates their
+        average result. Moves of batched games don't count for RAVE.
+        With ponder, the search goes on in a background thread while the opponent thinks, and
+        update keeps the subtree of the move played (see Pondering). Not with several workers.
+        With max_nodes, the tree stops growing at that many nodes: simulations then start from
+        the leaf reached by selection, until update frees the subtrees of the moves not played.
+
+        Raises:
+            ImportError: If batch_playouts is set and NumPy isn't installed.
+        """
+        if batch_playouts:
+            check_vector_env()
         self.time_limit = time_limit
         self.player = player
         self.root = None
+        self.tree_size = 0
+        self.max_nodes = max_nodes
+        self.workers = workers
+        self.rave = rave
+        self.rave_equivalence = rave_equivalence
+        self.rave_exploration = rave_exploration
+        self.heavy_playouts = heavy_playouts
+        self.playout_move = heavy_playout_move if heavy_playouts else random_playout_move
+        self.batch_playouts = batch_playouts
+        self.vector_env = None
+        self.parallel_search = RootParallelSearch(workers) if workers > 1 else None
+        self.ponder = ponder
+        self.pondering = Pondering()
+        # Position of the root while pondering is on, kept up to date by update
+        self.ponder_game = None
 
     def algorithm_name(self):
         return "MCTS"
 
-    def choose_move(self, game):
+    def choose_move(self, game, stop=None):
+        stats = SearchStats(self.algorithm_name())
+        self.search_stats = stats
+        if self.parallel_search is not None:
+            return self.choose_move_parallel(game, stats, stop)
+
+        self.pondering.stop()
+        self.ponder_game = game.copy() if self.ponder else None
+        if self.ponder:
+            self.pondering.collect(stats)
+        stats.reused_nodes = self.tree_size
         if self.root is None:
-            self.root = MCTSNode(game.copy(), parent=None, move=None)
+            self.root = MCTSNode(game, parent=None, move=None)
+            self.tree_size = 1
+        if self.batch_playouts and self.vector_env is None:
+            self.vector_env = make_vector_env(game)
+
+        # Handle case only 1 option. The root may already be expanded, by earlier searches or pondering
+        root_moves = self.root.untried_moves + [child.move for child in self.root.children]
+        if len(root_moves) == 1:
+            stats.finish()
+            return root_moves[0], 1
+
+        # Seconds spent in selection, expansion, simulation and backpropagation
+        phase_times = [0.0] * 4
+        stats.max_depth = 0
+        winning_move = self.search(game, search_deadline(self.time_limit, stop), stop, stats, phase_times)
+        self.record_stats(stats, phase_times)
+        if winning_move is not None:
+            return winning_move, self.root.visits
+
+        # print_debug(self.root)
+
+        # Stopped before the first simulation
+        if not self.root.children:
+            return self.root.untried_moves[0], self.root.visits
 
-        # Handle case only 1 option
-        if len(self.root.untried_moves) == 1:
-            return self.root.untried_moves[0], 1
+        best_move = self.root.best_child(c_param=0, player=self.player).move
+        return best_move, self.root.visits
 
-        start_time = time.time()
-        while time.time() - start_time < self.time_limit:
+    def search(self, game, deadline, stop, stats, phase_times):
+        """
+        Runs simulations from self.root, the position of game, until the deadline (a time.time()
+        value or None) passes or stop is stopped, adding them to stats and phase_times. Returns
+        a move of the player that wins right away if it finds one, else None.
+        """
+        rave_equivalence = self.rave_equivalence if self.rave else None
+        c_param = self.rave_exploration if self.rave else 1.4
+        while not search_stopped(deadline, stop):
+            phase_start = time.perf_counter()
             node = self.root
             temp_game = game.copy()
             first_expansion = True
+            depth = 0
+            # In RAVE mode, the nodes of the path and the (player, move id) of every move played
+            path = [node]
+            played = []
 
             # Selection
             while node.is_fully_expanded() and not temp_game.is_game_over():
-                node = node.best_child()
+                node = node.best_child(c_param, rave_equivalence, self.player)
                 first_expansion = False
-                temp_game.make_move(node.move)
+                depth += 1
+                if self.rave:
+                    played.append((temp_game.get_current_player(), node.move_id))
+                    path.append(node)
+                temp_game.make_move_unchecked(node.move)
+            selection_end = time.perf_counter()
 
-            # Expansion
-            if not node.is_fully_expanded():
+            # Expansion, unless the tree is full
+            if not node.is_fully_expanded() and (self.max_nodes is None or self.tree_size < self.max_nodes):
                 move = random.choice(node.untried_moves)
-                temp_game.make_move(move)
+                move_id = None
+                if self.rave:
+                    move_id = temp_game.encode_move(move)
+                    played.append((temp_game.get_current_player(), move_id))
+                temp_game.make_move_unchecked(move)
 
                 # Handle case win with 1 movement
-                if first_expansion and (temp_game.evaluate_game_state(self.player) == 1):
-                    return move, self.root.visits
+                if first_expansion and node.player_to_move == self.player and \
+                        temp_game.evaluate_game_state(self.player) == 1:
+                    return move
 
-                node = node.add_child(move, temp_game)
+                node = node.add_child(move, temp_game, move_id)
+                self.tree_size += 1
+                depth += 1
+                if self.rave:
+                    path.append(node)
+            expansion_end = time.perf_counter()
 
             # Simulation
-            while not temp_game.is_game_over():
-                temp_game.make_move(random.choice(temp_game.get_available_moves()))
+            if self.vector_env is not None and not temp_game.is_game_over():
+                game_result = self.vector_env.random_playouts(temp_game, self.batch_playouts, self.player)
+            else:
+                while not temp_game.is_game_over():
+                    move = self.playout_move(temp_game)
+                    if self.rave:
+                        played.append((temp_game.get_current_player(), temp_game.encode_move(move)))
+                    temp_game.make_move_unchecked(move)
+                game_result = temp_game.evaluate_game_state(self.player)
+            simulation_end = time.perf_counter()
 
             # Backpropagation
             while node is not None:
                 node.visits += 1
-                node.wins += temp_game.evaluate_game_state(self.player)
+                node.wins += game_result
                 node = node.parent
+            if self.rave:
+                self.update_amaf(path, played, game_result)
 
-        # print_debug(self.root)
+            stats.nodes += 1
+            stats.max_depth = max(stats.max_depth, depth)
+            phase_times[0] += selection_end - phase_start
+            phase_times[1] += expansion_end - selection_end
+            phase_times[2] += simulation_end - expansion_end
+            phase_times[3] += time.perf_counter() - simulation_end
 
-        best_move = self.root.best_child(c_param=0).move
-        return best_move, self.root.visits
+        return None
+
+    @staticmethod
+    def update_amaf(path, played, game_result):
+        """
+        Adds the result of a simulation to the AMAF statistics of every node of the path, for
+        each move that the player who moved from that node played from then on. path[i] is the
+        node where played[i] was played.
+        """
+        # The moves played after the path only need collecting
+        n_path = min(len(path), len(played))
+        seen = {1: set(), 2: set()}
+        for player, move_id in played[n_path:]:
+            seen[player].add(move_id)
+
+        for index in range(n_path - 1, -1, -1):
+            player, move_id = played[index]
+            seen[player].add(move_id)
+            amaf = path[index].amaf
+            for seen_id in seen[player]:
+                move_stats = amaf.get(seen_id)
+                if move_stats is None:
+                    amaf[seen_id] = [game_result, 1]
+                else:
+                    move_stats[0] += game_result
+                    move_stats[1] += 1
+
+    def record_stats(self, stats, phase_times):
+        stats.add_phase_times(phase_times)
+        stats.tree_size = self.tree_size
+        stats.finish()
+
+    def choose_move_parallel(self, game, stats, stop=None):
+        moves = game.get_available_moves()
+        if len(moves) == 1:
+            stats.finish()
+            return moves[0], 1
+
+        # A single search would return a winning move as soon as it expands it
+        winning_move = find_immediate_win(game, self.player)
+        if winning_move is not None:
+            stats.finish()
+            return winning_move, 0
+
+        players = [MCTSPlayer(worker_time_limit(self.time_limit, stop), self.player, rave=self.rave,
+                              rave_equivalence=self.rave_equivalence, rave_exploration=self.rave_exploration,
+                              heavy_playouts=self.heavy_playouts, batch_playouts=self.batch_playouts, max_nodes=self.max_nodes)
+                   for _ in range(self.workers)]
+        children, visits = self.parallel_search.search(players, game)
+
+        stats.nodes = visits
+        stats.finish()
+        if not children:
+            return moves[0], visits
+
+        best_move = max(children, key=lambda child: child[2] / child[1])[0]
+        return best_move, visits
 
     def update(self, move):
-        for child in self.root.children:
-            if child.move == move:
-                self.root = child
-                self.root.parent = None
-                return
+        self.pondering.stop()
+        self.reroot(move)
+        if self.ponder_game is not None:
+            self.ponder_game.make_move(move)
+            self.start_pondering()
 
-        self.root = None
+    def reroot(self, move):
+        """Moves the root to the child of move, freeing the rest of the tree right away."""
+        if self.root is not None:
+            self.root, released = reroot_tree(self.root, move)
+            self.tree_size -= released
+
+    def start_pondering(self):
+        """Searches on in the background if the opponent is to move in ponder_game."""
+        game = self.ponder_game
+        if game.is_game_over() or game.get_current_player() == self.player:
+            return
+
+        if self.root is None:
+            self.root = MCTSNode(game, parent=None, move=None)
+            self.tree_size = 1
+        self.pondering.start(self.search, game.copy(), self.algorithm_name())
+
+    def close(self):
+        """Stops pondering and shuts down the worker processes, if any."""
+        self.pondering.stop()
+        if self.parallel_search is not None:
+            self.parallel_search.close()
 
 
 def print_debug(node):
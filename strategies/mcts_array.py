@@ -0,0 +1,268 @@
+import time
+import random
+import math
+from array import array
+
+from botPlayer import BotPlayer
+from strategies.search_control import search_deadline, search_stopped
+from strategies.search_stats import SearchStats
+
+
+class MCTSTree:
+    """
+    MCTS tree stored in parallel preallocated arrays instead of one object per node. The children
+    of a node are allocated together in a contiguous block when the node is expanded, and each
+    child stores the index of its move in the parent's get_available_moves() list, so no game
+    state is kept: states are rebuilt by replaying moves from the root.
+    """
+    NO_NODE = -1
+
+    # Solver results, from the point of view of the searching player
+    UNKNOWN = 2
+    WIN = 1
+    DRAW = 0
+    LOSE = -1
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.visits = array('i', [0]) * capacity
+        self.wins = array('d', [0.0]) * capacity
+        self.parent = array('i', [self.NO_NODE]) * capacity
+        self.first_child = array('i', [self.NO_NODE]) * capacity
+        self.n_children = array('i', [0]) * capacity
+        self.move = array('i', [0]) * capacity
+        self.result = array('b', [self.UNKNOWN]) * capacity
+        self.size = 0
+        self.root = self.new_node(self.NO_NODE, 0)
+
+    def new_node(self, parent, move_index):
+        node = self.size
+        self.size += 1
+        self.visits[node] = 0
+        self.wins[node] = 0.0
+        self.parent[node] = parent
+        self.first_child[node] = self.NO_NODE
+        self.n_children[node] = 0
+        self.move[node] = move_index
+        self.result[node] = self.UNKNOWN
+        return node
+
+    def expand(self, node, n_moves):
+        """Allocates the children of node. Returns False if the tree is full."""
+        if self.size + n_moves > self.capacity:
+            return False
+
+        first = self.size
+        for move_index in range(n_moves):
+            self.new_node(node, move_index)
+        self.first_child[node] = first
+        self.n_children[node] = n_moves
+        return True
+
+    def children(self, node):
+        first = self.first_child[node]
+        return range(first, first + self.n_children[node])
+
+    def is_expanded(self, node):
+        return self.first_child[node] != self.NO_NODE
+
+    def child_for_move(self, node, move_index):
+        if not self.is_expanded(node) or move_index >= self.n_children[node]:
+            return self.NO_NODE
+        return self.first_child[node] + move_index
+
+    def reroot(self, node):
+        """
+        Keeps only the subtree below node, moving it to the start of the arrays. Nodes are
+        moved in allocation order, so each one moves down (or stays) and sibling blocks stay
+        contiguous.
+        """
+        subtree = [node]
+        for index in subtree:
+            subtree.extend(self.children(index))
+        subtree.sort()
+
+        new_index = {old: new for new, old in enumerate(subtree)}
+        for old, new in new_index.items():
+            self.visits[new] = self.visits[old]
+            self.wins[new] = self.wins[old]
+            self.parent[new] = new_index.get(self.parent[old], self.NO_NODE)
+            first = self.first_child[old]
+            self.first_child[new] = new_index[first] if first != self.NO_NODE else self.NO_NODE
+            self.n_children[new] = self.n_children[old]
+            self.move[new] = self.move[old]
+            self.result[new] = self.result[old]
+
+        self.size = len(subtree)
+        self.root = 0
+
+
+class ArrayMCTSPlayer(BotPlayer):
+    def __init__(self, time_limit=5, player=2, max_nodes=2 ** 20, solver=False):
+        """
+        MCTS on an MCTSTree of at most max_nodes nodes. When the tree is full, the search keeps
+        running simulations from the leaves it reaches without adding nodes. With solver, proven
+        wins and losses are propagated up the tree as in MCTSSolverPlayer.
+        """
+        self.time_limit = time_limit
+        self.player = player
+        self.max_nodes = max_nodes
+        self.solver = solver
+        self.tree = None
+        self.root_game = None
+
+    def algorithm_name(self):
+        return "MCTS-Array"
+
+    def choose_move(self, game, stop=None):
+        stats = SearchStats(self.algorithm_name())
+        self.search_stats = stats
+        if self.tree is None or self.root_game is None or self.root_game.get_hash() != game.get_hash():
+            self.tree = MCTSTree(self.max_nodes)
+            self.root_game = game.copy(track_previous_state=False)
+
+        root_moves = game.get_available_moves()
+
+        # Handle case only 1 option
+        if len(root_moves) == 1:
+            stats.finish()
+            return root_moves[0], 1
+
+        tree = self.tree
+        # Seconds spent in selection, expansion, simulation and backpropagation
+        phase_times = [0.0] * 4
+        stats.max_depth = 0
+        deadline = search_deadline(self.time_limit, stop)
+        while not search_stopped(deadline, stop):
+            if self.solver and tree.result[tree.root] != MCTSTree.UNKNOWN:
+                break
+
+            phase_start = time.perf_counter()
+            expansion_time = 0.0
+            node = tree.root
+            temp_game = game.copy(track_previous_state=False)
+            path = [(node, temp_game.get_current_player() == self.player)]
+
+            # Selection and expansion, replaying the moves of the path
+            while not temp_game.is_game_over():
+                moves = temp_game.get_available_moves()
+                if not tree.is_expanded(node):
+                    expansion_start = time.perf_counter()
+                    expanded = tree.expand(node, len(moves))
+                    expansion_time += time.perf_counter() - expansion_start
+                    if not expanded:
+                        break
+
+                unvisited = [child for child in tree.children(node) if tree.visits[child] == 0]
+                node = random.choice(unvisited) if unvisited else self.best_child(node, path[-1][1])
+                temp_game.make_move_unchecked(moves[tree.move[node]])
+                path.append((node, temp_game.get_current_player() == self.player))
+
+                if unvisited:
+                    if temp_game.is_game_over():
+                        result = temp_game.evaluate_game_state(self.player)
+                        tree.result[node] = MCTSTree.WIN if result == 1 else (
+                            MCTSTree.LOSE if result == -1 else MCTSTree.DRAW)
+
+                        # Handle case win with 1 movement
+                        if len(path) == 2 and result == 1:
+                            self.record_stats(stats, phase_times)
+                            return moves[tree.move[node]], tree.visits[tree.root]
+                    break
+            selection_end = time.perf_counter()
+
+            # Simulation
+            while not temp_game.is_game_over():
+                temp_game.make_move_unchecked(random.choice(temp_game.get_available_moves()))
+            simulation_end = time.perf_counter()
+
+            # Backpropagation
+            game_result = temp_game.evaluate_game_state(self.player)
+            for index, _ in path:
+                tree.visits[index] += 1
+                tree.wins[index] += game_result
+
+            if self.solver:
+                self.propagate_results(path)
+
+            stats.nodes += 1
+            stats.max_depth = max(stats.max_depth, len(path) - 1)
+            phase_times[0] += selection_end - phase_start - expansion_time
+            phase_times[1] += expansion_time
+            phase_times[2] += simulation_end - selection_end
+            phase_times[3] += time.perf_counter() - simulation_end
+
+        self.record_stats(stats, phase_times)
+        # Stopped before the first simulation
+        if tree.visits[tree.root] == 0:
+            return root_moves[0], 0
+
+        best_child = self.best_child(tree.root, is_alpha=True, c_param=0)
+        return root_moves[tree.move[best_child]], tree.visits[tree.root]
+
+    def record_stats(self, stats, phase_times):
+        stats.add_phase_times(phase_times)
+        stats.tree_size = self.tree.size
+        stats.finish()
+
+    def best_child(self, node, is_alpha, c_param=1.4):
+        """
+        Results and win ratios are counted for the searching player, so they are negated when
+        node is not alpha, that is when the opponent is to move there.
+        """
+        tree = self.tree
+        sign = 1 if is_alpha else -1
+        children = [child for child in tree.children(node) if tree.visits[child] > 0]
+
+        if c_param == 0:
+            if self.solver:
+                return max(children, key=lambda child: sign * (tree.result[child] * 10
+                           if tree.result[child] != MCTSTree.UNKNOWN else tree.wins[child] / tree.visits[child]))
+            return max(children, key=lambda child: sign * tree.wins[child] / tree.visits[child])
+
+        if self.solver:
+            unresolved = [child for child in children if tree.result[child] == MCTSTree.UNKNOWN]
+            if not unresolved:
+                return max(children, key=lambda child: sign * tree.result[child])
+            children = unresolved
+
+        log_visits = math.log(tree.visits[node])
+        return max(children, key=lambda child: sign * tree.wins[child] / tree.visits[child]
+                   + c_param * (2 * log_visits / tree.visits[child]) ** 0.5)
+
+    def propagate_results(self, path):
+        """
+        Marks nodes of the path as solved, from the leaf up: a node where the player moves is a
+        win if any child is, a node where the opponent moves is a loss if any child is, and a
+        node whose children are all solved takes the best (or worst) of their results.
+        """
+        tree = self.tree
+        for depth in range(len(path) - 2, -1, -1):
+            node, is_alpha = path[depth]
+            if tree.result[node] != MCTSTree.UNKNOWN or not tree.is_expanded(node):
+                continue
+
+            results = [tree.result[child] for child in tree.children(node)]
+            decisive = MCTSTree.WIN if is_alpha else MCTSTree.LOSE
+            if decisive in results:
+                tree.result[node] = decisive
+            elif MCTSTree.UNKNOWN not in results:
+                tree.result[node] = max(results) if is_alpha else min(results)
+            else:
+                return
+
+    def update(self, move):
+        if self.tree is None or self.root_game is None:
+            return
+
+        moves = self.root_game.get_available_moves()
+        child = MCTSTree.NO_NODE
+        if move in moves:
+            child = self.tree.child_for_move(self.tree.root, moves.index(move))
+
+        self.root_game.make_move(move)
+        if child == MCTSTree.NO_NODE:
+            self.tree = None
+            self.root_game = None
+        else:
+            self.tree.reroot(child)
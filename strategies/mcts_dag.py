@@ -0,0 +1,177 @@
+import time
+import random
+import math
+
+from botPlayer import BotPlayer
+from strategies.search_control import search_deadline, search_stopped
+from strategies.search_stats import SearchStats
+
+
+class DAGNode:
+    def __init__(self, key, untried_moves):
+        self.key = key
+        self.wins = 0
+        self.visits = 0
+        # Move id -> child node. Several parents can share the same child.
+        self.children = {}
+        self.untried_moves = untried_moves
+
+
+class DAGMCTSPlayer(BotPlayer):
+    def __init__(self, time_limit=5, player=2):
+        """
+        MCTS on a graph of positions instead of a tree: nodes are keyed by game.get_hash(), so
+        move orders that reach the same position share one node and its statistics. Game
+        states are not stored; they are rebuilt by replaying move ids from the root. Children
+        are chosen by UCB from the point of view of the player to move.
+        """
+        self.time_limit = time_limit
+        self.player = player
+        self.nodes = {}
+        self.root_game = None
+
+    def algorithm_name(self):
+        return "MCTS-DAG"
+
+    def get_node(self, game):
+        """Returns the node of the position of game, creating it if it isn't in the graph."""
+        key = game.get_hash()
+        node = self.nodes.get(key)
+        if node is None:
+            node = DAGNode(key, game.get_available_move_ids())
+            self.nodes[key] = node
+        return node
+
+    def choose_move(self, game, stop=None):
+        stats = SearchStats(self.algorithm_name())
+        self.search_stats = stats
+        if self.root_game is None or self.root_game.get_hash() != game.get_hash():
+            self.nodes = {}
+            self.root_game = game.copy(track_previous_state=False)
+
+        root = self.get_node(game)
+        moves = game.get_available_moves()
+
+        # Handle case only 1 option
+        if len(moves) == 1:
+            stats.finish()
+            return moves[0], 1
+
+        # Seconds spent in selection, expansion, simulation and backpropagation
+        phase_times = [0.0] * 4
+        stats.max_depth = 0
+        stats.tt_probes = stats.tt_hits = 0
+        deadline = search_deadline(self.time_limit, stop)
+        while not search_stopped(deadline, stop):
+            phase_start = time.perf_counter()
+            node = root
+            temp_game = game.copy(track_previous_state=False)
+            path = [root]
+            on_path = {root.key}
+
+            # Selection. Positions can repeat in Boop, so a node already on the path ends it
+            repeated = False
+            while not node.untried_moves and node.children and not temp_game.is_game_over():
+                move_id, node = self.select_child(node, temp_game.get_current_player() == self.player)
+                temp_game.make_move_unchecked(temp_game.decode_move(move_id))
+                if node.key in on_path:
+                    repeated = True
+                    break
+                path.append(node)
+                on_path.add(node.key)
+            selection_end = time.perf_counter()
+
+            # Expansion: the new child may already be in the graph, reached by another move order
+            if not repeated and node.untried_moves and not temp_game.is_game_over():
+                untried = node.untried_moves
+                index = random.randrange(len(untried))
+                untried[index], untried[-1] = untried[-1], untried[index]
+                move_id = untried.pop()
+                temp_game.make_move_unchecked(temp_game.decode_move(move_id))
+
+                # Handle case win with 1 movement
+                if node is root and temp_game.evaluate_game_state(self.player) == 1:
+                    self.record_stats(stats, phase_times)
+                    return temp_game.decode_move(move_id), root.visits
+
+                stats.tt_probes += 1
+                stats.tt_hits += temp_game.get_hash() in self.nodes
+                child = self.get_node(temp_game)
+                node.children[move_id] = child
+                if child.key not in on_path:
+                    path.append(child)
+            expansion_end = time.perf_counter()
+
+            # Simulation
+            while not temp_game.is_game_over():
+                temp_game.make_move_unchecked(random.choice(temp_game.get_available_moves()))
+            simulation_end = time.perf_counter()
+
+            # Backpropagation, along the path that was followed
+            game_result = temp_game.evaluate_game_state(self.player)
+            for path_node in path:
+                path_node.visits += 1
+                path_node.wins += game_result
+
+            stats.nodes += 1
+            stats.max_depth = max(stats.max_depth, len(path) - 1)
+            phase_times[0] += selection_end - phase_start
+            phase_times[1] += expansion_end - selection_end
+            phase_times[2] += simulation_end - expansion_end
+            phase_times[3] += time.perf_counter() - simulation_end
+
+        self.record_stats(stats, phase_times)
+        # Stopped before the first simulation
+        if not any(child.visits for child in root.children.values()):
+            return moves[0], root.visits
+
+        move_id = max((move_id for move_id, child in root.children.items() if child.visits > 0),
+                      key=lambda move_id: root.children[move_id].wins / root.children[move_id].visits)
+        return game.decode_move(move_id), root.visits
+
+    def select_child(self, node, is_my_turn, c_param=1.4):
+        """
+        Picks the (move id, child) pair with the highest UCB value. A shared child can have more
+        visits than this node, which only makes its exploration term smaller.
+        """
+        log_visits = math.log(max(node.visits, 1))
+        best_value = -float('inf')
+        best = None
+        for move_id, child in node.children.items():
+            if child.visits == 0:
+                return move_id, child
+            ratio = child.wins / child.visits
+            value = (ratio if is_my_turn else -ratio) + c_param * (2 * log_visits / child.visits) ** 0.5
+            if value > best_value:
+                best_value = value
+                best = (move_id, child)
+        return best
+
+    def record_stats(self, stats, phase_times):
+        stats.add_phase_times(phase_times)
+        stats.tree_size = len(self.nodes)
+        stats.finish()
+
+    def update(self, move):
+        """
+        Moves the root to the position after move and drops the nodes that can no longer be
+        reached from it.
+        """
+        if self.root_game is None:
+            return
+
+        self.root_game.make_move(move)
+        root = self.nodes.get(self.root_game.get_hash())
+        if root is None:
+            self.nodes = {}
+            self.root_game = None
+            return
+
+        reachable = {root.key: root}
+        pending = [root]
+        while pending:
+            for child in pending.pop().children.values():
+                if child.key not in reachable:
+                    reachable[child.key] = child
+                    pending.append(child)
+        self.nodes = reachable
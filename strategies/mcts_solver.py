@@ -3,15 +3,22 @@ import random
 import math
 
 from botPlayer import BotPlayer
+from strategies.playout import heavy_playout_move, random_playout_move
+from strategies.root_parallel import RootParallelSearch, find_immediate_win, worker_time_limit
+from strategies.pondering import Pondering
+from strategies.search_control import search_deadline, search_stopped
+from strategies.search_stats import SearchStats
+from strategies.tree_memory import reroot_tree
 
 
 class MCTSNode:
     WIN = 10
     LOSE = -10
     DRAW = 0
+    # Trees get big: nodes have slots and don't keep game_state, which would keep a whole game alive per node
+    __slots__ = ('parent', 'move', 'children', 'wins', 'visits', 'untried_moves', 'result', 'is_alpha')
 
     def __init__(self, game_state, parent=None, move=None, is_alpha=True):
-        self.game_state = game_state
         self.parent = parent
         self.move = move
         self.children = []
@@ -39,17 +46,22 @@ class MCTSNode:
         return len(self.untried_moves) == 0
 
     def best_child(self, c_param=1.4):
+        """
+        Results and win ratios are counted for the searching player, so they are taken as they
+        are at alpha nodes and negated at beta nodes, where the opponent is to move.
+        """
+        sign = 1 if self.is_alpha else -1
         if c_param == 0:
-            return max(self.children,
-                       key=lambda child: child.result if child.result is not None else child.wins / child.visits)
+            return max(self.children, key=lambda child: sign * (child.result if child.result is not None
+                                                                else child.wins / child.visits))
         else:
             unresolved_children = [child for child in self.children if child.result is None]
 
             if not unresolved_children:
-                return max(self.children, key=lambda child: child.result if child.result is not None else -float('inf'))
+                return max(self.children, key=lambda child: sign * child.result)
 
             choices_weights = [
-                (child.wins / child.visits) + c_param * (2 * math.log(self.visits) / child.visits) ** 0.5
+                sign * (child.wins / child.visits) + c_param * (2 * math.log(self.visits) / child.visits) ** 0.5
                 for child in unresolved_children
             ]
             return unresolved_children[choices_weights.index(max(choices_weights))]
@@ -87,51 +99,115 @@ class MCTSNode:
 
 
 class MCTSSolverPlayer(BotPlayer):
-    def __init__(self, depth_limit=50, time_limit=5, player=2):
+    def __init__(self, depth_limit=50, time_limit=5, player=2, workers=1, heavy_playouts=False, ponder=False,
+                 max_nodes=None):
+        """
+        With more than one worker, every move runs that many independent searches in parallel
+        processes and merges their root statistics (root parallelization).
+        With heavy_playouts, simulations play immediate wins and block immediate losses instead
+        of moving at random (see heavy_playout_move).
+        With ponder, the search goes on in a background thread while the opponent thinks, and
+        update keeps the subtree of the move played (see Pondering). Not with several workers.
+        With max_nodes, the tree stops growing at that many nodes: simulations then start from
+        the leaf reached by selection, until update frees the subtrees of the moves not played.
+        """
         self.time_limit = time_limit
         self.depth_limit = depth_limit
         self.player = player
         self.root = None
+        self.tree_size = 0
+        self.max_nodes = max_nodes
+        self.workers = workers
+        self.heavy_playouts = heavy_playouts
+        self.playout_move = heavy_playout_move if heavy_playouts else random_playout_move
+        self.parallel_search = RootParallelSearch(workers) if workers > 1 else None
+        self.ponder = ponder
+        self.pondering = Pondering()
+        # Position of the root while pondering is on, kept up to date by update
+        self.ponder_game = None
 
     def algorithm_name(self):
         return "MCTS-Solver"
 
-    def choose_move(self, game):
+    def choose_move(self, game, stop=None):
+        stats = SearchStats(self.algorithm_name())
+        self.search_stats = stats
+        if self.parallel_search is not None:
+            return self.choose_move_parallel(game, stats, stop)
+
+        self.pondering.stop()
+        self.ponder_game = game.copy(track_previous_state=False) if self.ponder else None
+        if self.ponder:
+            self.pondering.collect(stats)
+        stats.reused_nodes = self.tree_size
         if self.root is None:
-            self.root = MCTSNode(game.copy(track_previous_state=False), parent=None, move=None)
+            self.root = MCTSNode(game, parent=None, move=None, is_alpha=game.get_current_player() == self.player)
+            self.tree_size = 1
 
-        # Handle case only 1 option
-        if len(self.root.untried_moves) == 1:
-            return self.root.untried_moves[0], 1
+        # Handle case only 1 option. The root may already be expanded, by earlier searches or pondering
+        root_moves = self.root.untried_moves + [child.move for child in self.root.children]
+        if len(root_moves) == 1:
+            stats.finish()
+            return root_moves[0], 1
 
-        start_time = time.time()
-        while time.time() - start_time < self.time_limit:
+        # Seconds spent in selection, expansion, simulation and backpropagation
+        phase_times = [0.0] * 4
+        stats.max_depth = 0
+        self.search(game, search_deadline(self.time_limit, stop), stop, stats, phase_times)
+
+        # print_debug(self.root)
+
+        stats.add_phase_times(phase_times)
+        stats.tree_size = self.tree_size
+        stats.finish()
+        # Stopped before the first simulation
+        if not self.root.children:
+            return self.root.untried_moves[0], self.root.visits
+
+        best_move = self.root.best_child(c_param=0).move
+        return best_move, self.root.visits
+
+    def search(self, game, deadline, stop, stats, phase_times):
+        """
+        Runs simulations from self.root, the position of game, until the deadline (a time.time()
+        value or None) passes, stop is stopped or the root is solved, adding them to stats and
+        phase_times.
+        """
+        while not search_stopped(deadline, stop):
             if self.root.result is not None:
                 break
 
+            phase_start = time.perf_counter()
             node = self.root
             temp_game = game.copy(track_previous_state=False)
 
             depth = 0
+            tree_depth = 0
 
             # Selection
             while node.is_fully_expanded() and not temp_game.is_game_over():
                 node = node.best_child()
-                temp_game.make_move(node.move)
+                tree_depth += 1
+                temp_game.make_move_unchecked(node.move)
+            selection_end = time.perf_counter()
 
-            # Expansion
-            if not node.is_fully_expanded():
+            # Expansion, unless the tree is full
+            if not node.is_fully_expanded() and (self.max_nodes is None or self.tree_size < self.max_nodes):
                 move = random.choice(node.untried_moves)
-                temp_game.make_move(move)
+                temp_game.make_move_unchecked(move)
 
                 node = node.add_child(move, temp_game, self.player)
+                self.tree_size += 1
+                tree_depth += 1
+            expansion_end = time.perf_counter()
 
             # Simulation
             while not temp_game.is_game_over():
                 depth += 1
-                temp_game.make_move(random.choice(temp_game.get_available_moves()))
+                temp_game.make_move_unchecked(self.playout_move(temp_game))
                 if depth > self.depth_limit:
                     break
+            simulation_end = time.perf_counter()
 
             # Backpropagation
             game_result = temp_game.evaluate_game_state(self.player)
@@ -143,20 +219,67 @@ class MCTSSolverPlayer(BotPlayer):
 
                 node = node.parent
 
-        # print_debug(self.root)
-
-        best_move = self.root.best_child(c_param=0).move
-        return best_move, self.root.visits
+            stats.nodes += 1
+            stats.max_depth = max(stats.max_depth, tree_depth)
+            phase_times[0] += selection_end - phase_start
+            phase_times[1] += expansion_end - selection_end
+            phase_times[2] += simulation_end - expansion_end
+            phase_times[3] += time.perf_counter() - simulation_end
+
+    def choose_move_parallel(self, game, stats, stop=None):
+        moves = game.get_available_moves()
+        if len(moves) == 1:
+            stats.finish()
+            return moves[0], 1
+
+        # A proven win is the best possible result, no need to search for it
+        winning_move = find_immediate_win(game, self.player)
+        if winning_move is not None:
+            stats.finish()
+            return winning_move, 0
+
+        players = [MCTSSolverPlayer(self.depth_limit, worker_time_limit(self.time_limit, stop), self.player,
+                                    heavy_playouts=self.heavy_playouts, max_nodes=self.max_nodes)
+                   for _ in range(self.workers)]
+        children, visits = self.parallel_search.search(players, game)
+        stats.nodes = visits
+        stats.finish()
+        if not children:
+            return moves[0], visits
+
+        # Same criterion as best_child(c_param=0): proven results first, then win ratio
+        best_move = max(children, key=lambda stats: stats[3] if stats[3] is not None else stats[2] / stats[1])[0]
+        return best_move, visits
 
     def update(self, move):
-        if self.root:
-            for child in self.root.children:
-                if child.move == move:
-                    self.root = child
-                    self.root.parent = None
-                    return
+        self.pondering.stop()
+        self.reroot(move)
+        if self.ponder_game is not None:
+            self.ponder_game.make_move(move)
+            self.start_pondering()
+
+    def reroot(self, move):
+        """Moves the root to the child of move, freeing the rest of the tree right away."""
+        if self.root is not None:
+            self.root, released = reroot_tree(self.root, move)
+            self.tree_size -= released
+
+    def start_pondering(self):
+        """Searches on in the background if the opponent is to move in ponder_game."""
+        game = self.ponder_game
+        if game.is_game_over() or game.get_current_player() == self.player:
+            return
 
-        self.root = None
+        if self.root is None:
+            self.root = MCTSNode(game, parent=None, move=None, is_alpha=game.get_current_player() == self.player)
+            self.tree_size = 1
+        self.pondering.start(self.search, game.copy(track_previous_state=False), self.algorithm_name())
+
+    def close(self):
+        """Stops pondering and shuts down the worker processes, if any."""
+        self.pondering.stop()
+        if self.parallel_search is not None:
+            self.parallel_search.close()
 
 
 def print_debug(node):
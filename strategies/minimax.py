@@ -1,27 +1,87 @@
+import time
+
 from botPlayer import BotPlayer
+from strategies.search_control import SearchTimeout, search_deadline
+from strategies.search_stats import SearchStats
 
 
 class MinimaxPlayer(BotPlayer):
-    def __init__(self, depth_limit=5, player=2):
+    def __init__(self, depth_limit=5, player=2, time_limit=None):
+        """
+        With a time_limit (in seconds) the search deepens one ply at a time, up to depth_limit,
+        and plays the best move of the deepest iteration finished in time.
+        """
         self.depth_limit = depth_limit
+        self.time_limit = time_limit
         self.player = player
+        self.search_stats = None
+        self.search_depth = depth_limit
+        self.deadline = None
+        self.stop = None
 
     def algorithm_name(self):
         return "Minimax"
 
-    def choose_move(self, game):
+    def choose_move(self, game, stop=None):
+        stats = SearchStats(self.algorithm_name())
+        self.stop = stop
+        # A search that can be stopped deepens iteratively, so it always has a move to return
+        if self.time_limit is None and stop is None:
+            self.deadline = None
+            best_move, total_calls = self.search_root(game, self.depth_limit, game.get_available_moves())
+            depth_reached = self.depth_limit
+        else:
+            best_move, total_calls, depth_reached = self.iterative_deepening(game)
+
+        stats.nodes = total_calls
+        stats.max_depth = depth_reached
+        self.search_stats = stats.finish()
+        return best_move, total_calls
+
+    def iterative_deepening(self, game):
+        """
+        Searches with increasing depth until the time budget runs out or the search is stopped.
+        The best move of each finished iteration is searched first in the next one, so it wins
+        ties.
+        """
+        self.deadline = search_deadline(self.time_limit, self.stop)
+        moves = game.get_available_moves()
+        best_move = moves[0]
+        depth_reached = -1
+        total_calls = 0
+
+        for depth in range(self.depth_limit + 1):
+            try:
+                move, n_calls = self.search_root(game, depth, moves)
+            except SearchTimeout as timeout:
+                total_calls += timeout.args[0]
+                break
+
+            total_calls += n_calls
+            best_move, depth_reached = move, depth
+            moves.remove(move)
+            moves.insert(0, move)
+
+        return best_move, total_calls, depth_reached
+
+    def search_root(self, game, depth, moves):
+        self.search_depth = depth
         best_score = float('-inf')
         best_acc_score = float('-inf')
         min_moves = float('inf')
         best_move = None
         total_calls = 0
 
-        for move in game.get_available_moves():
-            game.make_move(move)
-            score, acc_score, n_moves, n = self.minimax(game, 0, False)
+        for move in moves:
+            game.make_move_unchecked(move)
+            try:
+                score, acc_score, n_moves, n = self.minimax(game, 0, False)
+            except SearchTimeout:
+                raise SearchTimeout(total_calls)
+            finally:
+                game.undo_move()
             total_calls += n
             # print(f'Move:{move}-> score:{score}, n_moves:{n_moves}, acc_score:{acc_score}')
-            game.undo_move()
             if ((score > best_score) or
                     (score == best_score and score >= 0 and n_moves < min_moves) or
                     (score == best_score and score < 0 and n_moves > min_moves) or
@@ -36,19 +96,25 @@ class MinimaxPlayer(BotPlayer):
     def minimax(self, game, depth, is_maximizing_player):
         acc_score = 0
         n_calls = 1
-        if depth == self.depth_limit or game.is_game_over():
+        if depth == self.search_depth or game.is_game_over():
             score = game.evaluate_game_state(self.player)
             return score, score, depth + 1, n_calls
 
+        if (self.deadline is not None and time.time() > self.deadline) or \
+                (self.stop is not None and self.stop.stopped):
+            raise SearchTimeout()
+
         if is_maximizing_player:
             best_score = float('-inf')
             min_moves = float('inf')
             for move in game.get_available_moves():
-                game.make_move(move)
-                score, acc, n_moves, n = self.minimax(game, depth + 1, False)
+                game.make_move_unchecked(move)
+                try:
+                    score, acc, n_moves, n = self.minimax(game, depth + 1, False)
+                finally:
+                    game.undo_move()
                 n_calls += n
                 acc_score += acc
-                game.undo_move()
                 if score > best_score or (score == best_score and n_moves < min_moves):
                     best_score = score
                     min_moves = n_moves
@@ -57,11 +123,13 @@ class MinimaxPlayer(BotPlayer):
             best_score = float('inf')
             min_moves = float('inf')
             for move in game.get_available_moves():
-                game.make_move(move)
-                score, acc, n_moves, n = self.minimax(game, depth + 1, True)
+                game.make_move_unchecked(move)
+                try:
+                    score, acc, n_moves, n = self.minimax(game, depth + 1, True)
+                finally:
+                    game.undo_move()
                 n_calls += n
                 acc_score += acc
-                game.undo_move()
                 if score < best_score or (score == best_score and n_moves < min_moves):
                     best_score = score
                     min_moves = n_moves
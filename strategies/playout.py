@@ -0,0 +1,26 @@
+import random
+
+
+def random_playout_move(game):
+    """Picks the next move of a simulation uniformly at random."""
+    return random.choice(game.get_available_moves())
+
+
+def heavy_playout_move(game):
+    """
+    Picks the next move of a simulation with one ply of tactics: a move that wins right away if
+    there is one, else a move that takes away an immediate win of the opponent, else a random
+    move. Playouts get slower but stop wasting wins and missing obvious defences, so their
+    results are closer to what real play would give.
+    """
+    player = game.get_current_player()
+    winning_moves = game.get_winning_moves(player)
+    if winning_moves:
+        return random.choice(winning_moves)
+
+    opponent = 2 if player == 1 else 1
+    blocking_moves = game.get_blocking_moves(opponent)
+    if blocking_moves:
+        return random.choice(blocking_moves)
+
+    return random.choice(game.get_available_moves())
@@ -0,0 +1,53 @@
+import threading
+
+from strategies.search_control import StopToken
+from strategies.search_stats import SearchStats
+
+
+class Pondering:
+    """
+    Pondering: a player's search goes on in a background thread while the opponent thinks, so
+    its tree keeps growing on the opponent's time. The player must stop it before touching the
+    tree again, which keeps the tree used by a single thread at a time. Python threads share
+    one core, so pondering pays off against humans; against a bot in the same process it slows
+    the opponent's search down by as much as it speeds up this one.
+    """
+
+    def __init__(self):
+        self.thread = None
+        self.stop_token = None
+        self.stats = None
+        # Simulations and seconds of pondering since the last collect
+        self.nodes = 0
+        self.time = 0.0
+
+    def start(self, search, game, algorithm):
+        """
+        Runs search(game, deadline, stop, stats, phase_times) in a background thread, without a
+        deadline, until stop is called.
+        """
+        self.stop_token = StopToken()
+        self.stats = SearchStats(algorithm)
+        self.stats.max_depth = 0
+        self.thread = threading.Thread(target=search, args=(game, None, self.stop_token, self.stats, [0.0] * 4),
+                                       daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        """Stops the search, if any, and waits for its last simulation to finish."""
+        if self.thread is None:
+            return
+
+        self.stop_token.stop()
+        self.thread.join()
+        self.thread = None
+        self.stats.finish()
+        self.nodes += self.stats.nodes
+        self.time += self.stats.time
+
+    def collect(self, stats):
+        """Moves the simulations and time of pondering since the last collect into stats."""
+        stats.ponder_nodes = self.nodes
+        stats.ponder_time = self.time
+        self.nodes = 0
+        self.time = 0.0
@@ -0,0 +1,85 @@
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+
+def run_root_search(player, game, seed):
+    """
+    Runs one independent search in a worker process and returns the statistics of the
+    root children as (move, visits, wins, result) tuples, with the root visits.
+    """
+    random.seed(seed)
+    player.choose_move(game)
+    root = player.root
+    children = [(child.move, child.visits, child.wins, getattr(child, 'result', None)) for child in root.children]
+    return root.visits, children
+
+
+def worker_time_limit(time_limit, stop=None):
+    """
+    The time limit of the searches of the workers. A stop token can't reach other processes, so
+    they only get its deadline, and none of the time if it's already stopped.
+    """
+    if stop is None:
+        return time_limit
+    if stop.stopped:
+        return 0
+    if stop.deadline is None:
+        return time_limit
+    return max(0, min(time_limit, stop.deadline - time.time()))
+
+
+def find_immediate_win(game, player):
+    """Returns a move that wins the game for player right away, or None."""
+    for move in game.get_available_moves():
+        next_game = game.copy(track_previous_state=False)
+        next_game.make_move_unchecked(move)
+        if next_game.evaluate_game_state(player) == 1:
+            return move
+    return None
+
+
+class RootParallelSearch:
+    """
+    Root parallelization: several independent searches from the same position run in a pool
+    of worker processes and their root children statistics are summed afterwards.
+    """
+
+    def __init__(self, workers):
+        self.workers = workers
+        self.executor = None
+
+    def search(self, players, game):
+        """
+        Runs one search per player (each with its own seed) and returns the merged root
+        children as [move, visits, wins, result] lists, with the total root visits.
+        """
+        if self.executor is None:
+            self.executor = ProcessPoolExecutor(max_workers=self.workers)
+
+        root_game = game.copy(track_previous_state=False)
+        futures = [self.executor.submit(run_root_search, player, root_game, random.getrandbits(64))
+                   for player in players]
+
+        total_visits = 0
+        merged = []
+        for future in futures:
+            root_visits, children = future.result()
+            total_visits += root_visits
+            for move, visits, wins, result in children:
+                stats = next((stats for stats in merged if stats[0] == move), None)
+                if stats is None:
+                    merged.append([move, visits, wins, result])
+                else:
+                    stats[1] += visits
+                    stats[2] += wins
+                    # A proven result is exact, whichever worker found it
+                    if result is not None:
+                        stats[3] = result
+
+        return merged, total_visits
+
+    def close(self):
+        if self.executor is not None:
+            self.executor.shutdown()
+            self.executor = None
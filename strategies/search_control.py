@@ -0,0 +1,36 @@
+import time
+
+
+class SearchTimeout(Exception):
+    """Raised inside a search when its time budget runs out, to unwind back to the root."""
+
+
+class StopToken:
+    """
+    Lets the caller of choose_move end the search early: stop() can be called from any thread,
+    and a deadline (a time.time() value) stops the search when it passes. The search then
+    returns the best move it has found so far.
+    """
+
+    def __init__(self, deadline=None):
+        self.deadline = deadline
+        self.stopped = False
+
+    def stop(self):
+        self.stopped = True
+
+
+def search_deadline(time_limit, stop=None):
+    """
+    Returns the time.time() at which a search must end: time_limit seconds from now or the
+    deadline of stop, whichever comes first, or None if there is neither.
+    """
+    deadline = time.time() + time_limit if time_limit is not None else None
+    if stop is not None and stop.deadline is not None:
+        deadline = stop.deadline if deadline is None else min(deadline, stop.deadline)
+    return deadline
+
+
+def search_stopped(deadline, stop=None):
+    """Whether a search with this deadline (or None) and stop token (or None) must end now."""
+    return (deadline is not None and time.time() > deadline) or (stop is not None and stop.stopped)
@@ -0,0 +1,95 @@
+import json
+import sys
+import time
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+
+def peak_memory_kb():
+    """Peak resident memory of the process in KiB, or None if the platform can't tell."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS reports bytes, Linux kilobytes
+    return peak // 1024 if sys.platform == 'darwin' else peak
+
+
+class SearchStats:
+    """
+    Statistics of one choose_move call. Every strategy fills in the counters that apply to it
+    and leaves the rest as None: nodes are searched positions for Minimax and AlphaBeta and
+    simulations for the MCTS players, and max_depth is the deepest finished iteration or the
+    deepest tree node reached.
+    """
+    MCTS_PHASES = ('selection', 'expansion', 'simulation', 'backpropagation')
+
+    def __init__(self, algorithm):
+        self.algorithm = algorithm
+        self.nodes = 0
+        self.time = 0.0
+        self.max_depth = None
+        self.phase_times = {}
+        self.tt_probes = None
+        self.tt_hits = None
+        self.tt_capacity = None
+        self.tree_size = None
+        # Tree nodes kept from earlier searches, and simulations and seconds of pondering since the last move
+        self.reused_nodes = None
+        self.ponder_nodes = None
+        self.ponder_time = None
+        self.peak_memory_kb = None
+        self.start_time = time.perf_counter()
+
+    def finish(self):
+        """Records the elapsed time and the peak memory. Called once the move is chosen."""
+        self.time = time.perf_counter() - self.start_time
+        self.peak_memory_kb = peak_memory_kb()
+        return self
+
+    @property
+    def nodes_per_second(self):
+        return self.nodes / self.time if self.time else 0.0
+
+    @property
+    def tt_hit_rate(self):
+        if self.tt_probes is None:
+            return None
+        return self.tt_hits / self.tt_probes if self.tt_probes else 0.0
+
+    def add_table_stats(self, table):
+        """Fills in the counters of a TranspositionTable, the entries it holds being the tree size."""
+        table_stats = table.stats()
+        self.tt_probes = table_stats['tt_probes']
+        self.tt_hits = table_stats['tt_hits']
+        self.tt_capacity = table_stats['tt_capacity']
+        self.tree_size = table_stats['tt_size']
+
+    def add_phase_times(self, phase_times):
+        """Adds a list of seconds per phase, in MCTS_PHASES order."""
+        for phase, seconds in zip(self.MCTS_PHASES, phase_times):
+            self.phase_times[phase] = self.phase_times.get(phase, 0.0) + seconds
+
+    def to_dict(self):
+        return {
+            'algorithm': self.algorithm,
+            'nodes': self.nodes,
+            'time': self.time,
+            'nodes_per_second': self.nodes_per_second,
+            'max_depth': self.max_depth,
+            'phase_times': dict(self.phase_times),
+            'tt_probes': self.tt_probes,
+            'tt_hits': self.tt_hits,
+            'tt_hit_rate': self.tt_hit_rate,
+            'tt_capacity': self.tt_capacity,
+            'tree_size': self.tree_size,
+            'reused_nodes': self.reused_nodes,
+            'ponder_nodes': self.ponder_nodes,
+            'ponder_time': self.ponder_time,
+            'peak_memory_kb': self.peak_memory_kb,
+        }
+
+    def to_json(self):
+        return json.dumps(self.to_dict())
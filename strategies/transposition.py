@@ -0,0 +1,56 @@
+class TranspositionTable:
+    """
+    Fixed-size table of search results indexed by position key. Each slot holds one entry;
+    a new result replaces the stored one if it was searched at least as deep, or if the
+    stored entry comes from an older search.
+    """
+    EXACT = 0
+    LOWER_BOUND = 1
+    UPPER_BOUND = 2
+
+    def __init__(self, size=2 ** 18):
+        self.size = size
+        self.entries = [None] * size
+        self.stored = 0
+        self.generation = 0
+        self.probes = 0
+        self.hits = 0
+
+    def new_search(self):
+        """Starts a new search: older entries become replaceable and the counters are reset."""
+        self.generation += 1
+        self.probes = 0
+        self.hits = 0
+
+    def probe(self, key):
+        """
+        Returns the (key, depth, flag, score, best_move, generation) entry stored for key,
+        or None if there is none.
+        """
+        self.probes += 1
+        entry = self.entries[key % self.size]
+        if entry is not None and entry[0] == key:
+            self.hits += 1
+            return entry
+        return None
+
+    def store(self, key, depth, flag, score, best_move):
+        index = key % self.size
+        entry = self.entries[index]
+        if entry is None:
+            self.stored += 1
+        elif entry[5] == self.generation and entry[1] > depth:
+            return
+        self.entries[index] = (key, depth, flag, score, best_move, self.generation)
+
+    def stats(self):
+        return {
+            'tt_probes': self.probes,
+            'tt_hits': self.hits,
+            'tt_hit_rate': self.hits / self.probes if self.probes else 0.0,
+            'tt_size': self.stored,
+            'tt_capacity': self.size,
+        }
+
+    def __len__(self):
+        return self.stored
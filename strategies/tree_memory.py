@@ -0,0 +1,34 @@
+def release_subtree(node):
+    """
+    Tears down the subtree of node, which must already be out of the tree, and returns its
+    number of nodes. Children point back to their parent, so a dropped subtree is a reference
+    cycle that waits for the garbage collector; unlinking every node frees it right away.
+    """
+    count = 0
+    pending = [node]
+    while pending:
+        node = pending.pop()
+        pending.extend(node.children)
+        node.children = []
+        node.parent = None
+        count += 1
+    return count
+
+
+def reroot_tree(root, move):
+    """
+    Returns the child of root reached by move as the new root (None if it isn't in the tree)
+    and the number of nodes released: root itself and all its other subtrees.
+    """
+    new_root = None
+    released = 1
+    for child in root.children:
+        if new_root is None and child.move == move:
+            new_root = child
+        else:
+            released += release_subtree(child)
+    root.children = []
+
+    if new_root is not None:
+        new_root.parent = None
+    return new_root, released
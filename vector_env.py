@@ -0,0 +1,94 @@
+import random
+from abc import ABC, abstractmethod
+
+try:
+    import numpy as np
+except ImportError:  # Vector environments are optional
+    np = None
+
+
+class VectorEnv(ABC):
+    """
+    Many copies of a game stepped together with NumPy arrays, one row per environment. Actions
+    are move ids. Environments that are over ignore the actions they get.
+    """
+
+    @abstractmethod
+    def reset(self, n, game=None):
+        """Starts n environments, at the start of the game or at the position of game."""
+        pass
+
+    @abstractmethod
+    def legal_mask(self):
+        """Boolean array (n, number of move ids) of the legal moves of every environment."""
+        pass
+
+    @abstractmethod
+    def step(self, actions):
+        """Plays one move id in every environment that isn't over."""
+        pass
+
+    @abstractmethod
+    def terminal(self):
+        """Boolean array (n,) of the environments that are over."""
+        pass
+
+    @abstractmethod
+    def reward(self, player):
+        """Array (n,) with 1 where player won, -1 where it lost and 0 otherwise."""
+        pass
+
+    def random_actions(self, rng):
+        """A legal move id of every environment, chosen uniformly at random (0 if there is none)."""
+        mask = self.legal_mask()
+        return (rng.random(mask.shape) * mask).argmax(axis=1)
+
+    def random_playouts(self, game, n, player, rng=None):
+        """
+        Plays n random games from the position of game at once and returns the average result
+        for player, between -1 and 1.
+        """
+        # Seeded from random, so that seeding random makes the playouts reproducible too
+        rng = np.random.default_rng(random.getrandbits(64)) if rng is None else rng
+        self.reset(n, game)
+        while not self.terminal().all():
+            self.step(self.random_actions(rng))
+        return float(self.reward(player).mean())
+
+
+# Names (Game.game_name()) of the games that have a vector environment
+VECTOR_ENV_GAMES = ('TicTacToe', 'Connect4', 'Boop')
+
+
+def check_vector_env(game_name=None):
+    """
+    Checks that vector environments can be used, for the game called game_name if given, so
+    that players can refuse them before the first move.
+
+    Raises:
+        ImportError: If NumPy isn't installed.
+        ValueError: If the game has no vector environment.
+    """
+    if np is None:
+        raise ImportError("Vector environments need NumPy (pip install numpy)")
+    if game_name is not None and game_name not in VECTOR_ENV_GAMES:
+        raise ValueError(f"No vector environment for {game_name}. Available: {', '.join(VECTOR_ENV_GAMES)}")
+
+
+def make_vector_env(game):
+    """
+    Returns a vector environment for the game of a Game object.
+
+    Raises:
+        ImportError: If NumPy isn't installed.
+        ValueError: If the game has no vector environment.
+    """
+    check_vector_env(game.game_name())
+
+    # Imported here so the games don't depend on NumPy
+    from games.tictactoe_vector import TicTacToeVectorEnv
+    from games.connect4_vector import ConnectFourVectorEnv
+    from games.boop_vector import BoopVectorEnv
+
+    envs = {'TicTacToe': TicTacToeVectorEnv, 'Connect4': ConnectFourVectorEnv, 'Boop': BoopVectorEnv}
+    return envs[game.game_name()]()